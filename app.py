@@ -1,44 +1,260 @@
-from flask import Flask, render_template, request, redirect, url_for, session
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, has_request_context
 import random
 import os
+import threading
 import time
 import hashlib
+import json
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
 
+from itsdangerous import BadSignature, URLSafeSerializer
+from markupsafe import Markup
+
+import cubefile
+import eventlog
+import jobs
+import locales
+import metrics
+from blocklists import DAILY_BLOCKLIST, RANDOM_BLOCKLIST
+from cube_index import CubeIndex, iter_ids, nth_id
+from lexicon import Lexicon
+import profiling
+import results
+import selection
+
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', os.urandom(24))
 
 # expose Python builtin helpers to Jinja templates (safe convenience)
 app.jinja_env.globals['enumerate'] = enumerate
 
+metrics.init_app(app)
+profiling.init_app(app)
+
 CANDIDATE_CUBES = os.path.join('word_lists', 'word_cubes.txt')
 CUBES_FILE = CANDIDATE_CUBES if os.path.exists(CANDIDATE_CUBES) else 'word_cubes.txt'
+# written by generators/analyze_reveals.py
+REVEAL_PATTERNS_FILE = os.path.join('word_lists', 'reveal_patterns.json')
+# memory-mapped guess dictionary (see lexicon.py); built from the text list if missing
+LEXICON_FILE = os.path.join('word_lists', 'lexicon.bin')
+WORD_LIST_FILE = os.path.join('word_lists', 'word_list_wordfreq.txt')
 MAX_ATTEMPTS = 6
+# most boards one /endless/next call hands out
+ENDLESS_BATCH_MAX = 10
+# letters revealed at the start of a game, by difficulty
+REVEAL_COUNTS = {
+    'daily': 4,
+    'easy': 8,
+    'medium': 6,
+    'hard': 4,
+    'insane': 0,
+}
+
+# /stats serves today and the days before it, up to this many in all
+STATS_DAYS = 2
+
+# corpora of the most recently used locales, oldest first; see get_corpus
+LOCALE_CACHE_SIZE = int(os.environ.get('WORDCUBE_LOCALE_CACHE', '4'))
+CORPORA = OrderedDict()
+CORPORA_LOCK = threading.Lock()
+# rendered attempt grids, most recently used last; see attempt_fragment
+FRAGMENT_CACHE_SIZE = int(os.environ.get('WORDCUBE_FRAGMENT_CACHE', '4096'))
+ATTEMPT_FRAGMENTS = OrderedDict()
+ATTEMPT_FRAGMENTS_LOCK = threading.Lock()
+CUBES_CHECKED_AT = float('-inf')
+CUBES_CHECK_SECONDS = 2.0
+
+
+def load_cubes(path=None):
+    path = path or CUBES_FILE
+    if not os.path.exists(path):
+        return []
+    return cubefile.load_cubes(path)
+
+
+def file_version(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class Corpus:
+    """One locale's cube corpus and everything derived from it, built on first use."""
+
+    def __init__(self, locale):
+        self.locale = locale
+        if locale == locales.DEFAULT_LOCALE:
+            self.cubes_file = CUBES_FILE
+            self.reveal_patterns_file = REVEAL_PATTERNS_FILE
+            self.lexicon_file = LEXICON_FILE
+            self.word_list_file = WORD_LIST_FILE
+        else:
+            base = locales.locale_dir(locale)
+            self.cubes_file = os.path.join(base, 'word_cubes.txt')
+            self.reveal_patterns_file = os.path.join(base, 'reveal_patterns.json')
+            self.lexicon_file = os.path.join(base, 'lexicon.bin')
+            self.word_list_file = os.path.join(base, 'word_list_wordfreq.txt')
+        # (mtime, size) of cubes_file at load; see reload_cubes_if_changed
+        self.version = file_version(self.cubes_file)
+        self.cubes = None
+        self.daily_cubes = None
+        self.random_cubes = None
+        self.solver_index = None
+        # CubeIndex over random_cubes, for themed games (word / avoided letters)
+        self.random_index = None
+        self.reveal_patterns = None
+        self.lexicon = None
+
+
+def current_locale():
+    """Locale of the game in this session, or the default outside a request."""
+    if has_request_context():
+        return session.get('locale') or locales.DEFAULT_LOCALE
+    return locales.DEFAULT_LOCALE
+
+
+def get_corpus(locale=None):
+    """The Corpus for `locale` (default: the current game's), kept in a small LRU.
+
+    At most LOCALE_CACHE_SIZE corpora stay resident per worker; the least
+    recently used one is dropped with all its caches when another is loaded.
+    """
+    locale = locale or current_locale()
+    with CORPORA_LOCK:
+        corpus = CORPORA.get(locale)
+        if corpus is None:
+            corpus = CORPORA[locale] = Corpus(locale)
+            while len(CORPORA) > LOCALE_CACHE_SIZE:
+                CORPORA.popitem(last=False)
+            hit = False
+        else:
+            CORPORA.move_to_end(locale)
+            hit = True
+    metrics.cache_lookup('corpus', hit)
+    return corpus
+
+
+def reset_caches():
+    """Forget every loaded corpus."""
+    with CORPORA_LOCK:
+        CORPORA.clear()
+
+
+@app.before_request
+def reload_cubes_if_changed():
+    """Pick up a cube file replaced under us (e.g. by an admin regeneration job).
+
+    Checks the loaded corpora at most every CUBES_CHECK_SECONDS per worker and
+    drops any whose file changed; it is reloaded on next use.
+    """
+    global CUBES_CHECKED_AT
+    now = time.monotonic()
+    if now - CUBES_CHECKED_AT < CUBES_CHECK_SECONDS:
+        return
+    CUBES_CHECKED_AT = now
+    with CORPORA_LOCK:
+        stale = [c.locale for c in CORPORA.values() if file_version(c.cubes_file) != c.version]
+        for locale in stale:
+            del CORPORA[locale]
 
-CUBES_CACHE = None
-DAILY_CUBES_CACHE = None
-RANDOM_CUBES_CACHE = None
+
+def cubes_file_for(locale):
+    return Corpus(locale or locales.DEFAULT_LOCALE).cubes_file
+
+
+jobs.init_app(app, cubes_file_for, load_cubes)
+
+
+def get_cubes(locale=None):
+    corpus = get_corpus(locale)
+    metrics.cache_lookup('cubes', corpus.cubes is not None)
+    if corpus.cubes is None:
+        corpus.cubes = load_cubes(corpus.cubes_file)
+    return corpus.cubes
+
+
+def get_lexicon(locale=None):
+    """Shared guess dictionary, or None when no word list is available."""
+    corpus = get_corpus(locale)
+    metrics.cache_lookup('lexicon', corpus.lexicon is not None)
+    if corpus.lexicon is None:
+        if os.path.exists(corpus.lexicon_file):
+            corpus.lexicon = Lexicon.load(corpus.lexicon_file)
+        elif os.path.exists(corpus.word_list_file):
+            with open(corpus.word_list_file, 'r') as f:
+                corpus.lexicon = Lexicon.from_words(f)
+    return corpus.lexicon
+
+
+def is_valid_row(guess_row, solution_row, locale=None):
+    """Partial rows (with spaces) are always allowed; complete rows must be words."""
+    if ' ' in guess_row or guess_row == solution_row:
+        return True
+    lexicon = get_lexicon(locale)
+    return lexicon is None or guess_row in lexicon
 
 
-def load_cubes():
-    cubes = []
-    if not os.path.exists(CUBES_FILE):
-        return cubes
-    with open(CUBES_FILE, 'r') as f:
-        text = f.read()
-    blocks = [b.strip() for b in text.split('\n\n') if b.strip()]
-    for b in blocks:
-        rows = [line.replace(' ', '').lower() for line in b.splitlines() if line.strip()]
-        if len(rows) == 4 and all(len(r) == 4 for r in rows):
-            cubes.append(rows)
-    return cubes
+def get_solver_index(locale=None):
+    corpus = get_corpus(locale)
+    metrics.cache_lookup('solver_index', corpus.solver_index is not None)
+    if corpus.solver_index is None:
+        corpus.solver_index = CubeIndex(get_cubes(locale))
+    return corpus.solver_index
 
 
-def get_cubes():
-    global CUBES_CACHE
-    if CUBES_CACHE is None:
-        CUBES_CACHE = load_cubes()
-    return CUBES_CACHE
+def get_daily_cubes(locale=None):
+    corpus = get_corpus(locale)
+    metrics.cache_lookup('daily_cubes', corpus.daily_cubes is not None)
+    if corpus.daily_cubes is None:
+        corpus.daily_cubes = filter_cubes(get_cubes(locale), DAILY_BLOCKLIST)
+    return corpus.daily_cubes
+
+
+def get_random_cubes(locale=None):
+    corpus = get_corpus(locale)
+    metrics.cache_lookup('random_cubes', corpus.random_cubes is not None)
+    if corpus.random_cubes is None:
+        corpus.random_cubes = filter_cubes(get_cubes(locale), RANDOM_BLOCKLIST)
+    return corpus.random_cubes
+
+
+def get_random_index(locale=None):
+    corpus = get_corpus(locale)
+    metrics.cache_lookup('random_index', corpus.random_index is not None)
+    if corpus.random_index is None:
+        corpus.random_index = CubeIndex(get_random_cubes(locale))
+    return corpus.random_index
+
+
+def get_reveal_patterns(locale=None):
+    corpus = get_corpus(locale)
+    metrics.cache_lookup('reveal_patterns', corpus.reveal_patterns is not None)
+    if corpus.reveal_patterns is None:
+        patterns = {}
+        if os.path.exists(corpus.reveal_patterns_file):
+            with open(corpus.reveal_patterns_file, 'r') as f:
+                patterns = json.load(f).get('cubes', {})
+        corpus.reveal_patterns = patterns
+    return corpus.reveal_patterns
+
+
+def choose_revealed(cube, count, rng=random, locale=None):
+    """Pick `count` cells to reveal, preferring precomputed selective patterns.
+
+    Falls back to uniformly random cells when the cube has no entry in the
+    reveal-pattern table (e.g. the table predates the current corpus).
+    """
+    if count <= 0:
+        return []
+    masks = get_reveal_patterns(locale).get('/'.join(cube), {}).get(str(count))
+    if masks:
+        mask = rng.choice(masks)
+        return [(r, c) for r in range(4) for c in range(4) if mask & (1 << (r * 4 + c))]
+    all_pos = [(r, c) for r in range(4) for c in range(4)]
+    return rng.sample(all_pos, count)
 
 
 def filter_cubes(cubes, blocklist):
@@ -111,17 +327,20 @@ def get_daily_seed():
     return date_str, seed
 
 
-def start_daily_game():
-    global DAILY_CUBES_CACHE
-    cubes = get_cubes()
-    if not cubes:
-        return "No cubes found. Please run main2.py to generate word_cubes.txt", 500
+def metric_mode(mode):
+    """`mode` as a metrics label: a known difficulty or 'endless', else 'other'.
+
+    Labels come from form input and the session, so unknown values are folded
+    together to keep the number of series bounded.
+    """
+    return mode if mode in REVEAL_COUNTS or mode == 'endless' else 'other'
 
-    # Stricter blocklist for daily cube
-    daily_blocklist = ['anal', 'anus', 'cock', 'damn', 'hell', 'slut', 'dick', 'fuck', 'shit', 'cunt', 'whore']
-    if DAILY_CUBES_CACHE is None:
-        DAILY_CUBES_CACHE = filter_cubes(cubes, daily_blocklist)
-    cubes = DAILY_CUBES_CACHE
+
+def start_daily_game(locale=None):
+    locale = locale or current_locale()
+    if not get_cubes(locale):
+        return "No cubes found. Please run main2.py to generate word_cubes.txt", 500
+    cubes = get_daily_cubes(locale)
     if not cubes:
         return "No appropriate cubes found.", 500
 
@@ -130,10 +349,9 @@ def start_daily_game():
     cube = cubes[idx]
 
     # reveal 4 deterministic positions based on seed
-    all_pos = [(r, c) for r in range(4) for c in range(4)]
-    rng = random.Random(seed)
-    revealed = rng.sample(all_pos, 4)
+    revealed = choose_revealed(cube, 4, random.Random(seed), locale)
 
+    session['locale'] = locale
     session['cube'] = cube
     session['revealed'] = revealed
     session['game_mode'] = 'daily'
@@ -145,9 +363,25 @@ def start_daily_game():
     session['guessed_letters'] = []
     session['start_time'] = time.time()
     session['end_time'] = None
+    session['recorded'] = False
+    session['hinted'] = False
+    metrics.inc('wordcube_games_started_total', mode='daily')
+    eventlog.log_start('daily', cube)
     return None
 
 
+def record_result(solved):
+    """Queue the finished game for the results store, once per game."""
+    if session.get('recorded'):
+        return
+    session['recorded'] = True
+    start, end = session.get('start_time'), session.get('end_time')
+    day = session.get('daily_date') or get_daily_seed()[0]
+    results.record(day, session.get('game_mode', 'daily'), session.get('difficulty'), solved,
+                   len(session.get('attempts', [])), end - start if start and end else None,
+                   session.get('hinted', False))
+
+
 def compute_feedback_enhanced(guess, solution, cube, row_idx, revealed, attempts, feedbacks, current_feedback, submission_greens=None):
     """
     Three-pass feedback logic:
@@ -233,6 +467,54 @@ def compute_feedback_enhanced(guess, solution, cube, row_idx, revealed, attempts
     
     return ''.join(result)
 
+def consistent_cubes(cube, revealed, attempts, feedbacks):
+    """Ids of corpus cubes that would have produced this game's feedback history.
+
+    The bitmap index narrows the corpus first; only the survivors are replayed
+    through `compute_feedback_all_rows` to apply the exact Y/P/_ rules.
+    """
+    index = get_solver_index()
+    known = {(r, c): cube[r][c] for (r, c) in revealed}
+    mask = index.narrow(known, attempts, feedbacks)
+    result = []
+    for i in iter_ids(mask):
+        candidate = index.cubes[i]
+        ok = True
+        for n, attempt in enumerate(attempts):
+            fbs = compute_feedback_all_rows(attempt, candidate, revealed, attempts[:n], feedbacks[:n])
+            if fbs != feedbacks[n]:
+                ok = False
+                break
+        if ok:
+            result.append(i)
+    return result
+
+
+def attempt_fragment(guess_rows, fb_rows, revealed):
+    """HTML of one finished attempt's grid, rendered once and then served from an LRU.
+
+    A finished attempt never changes, so the fragment is keyed by its guess
+    and feedback rows plus the revealed cells (which turn grey in it).
+    """
+    mask = 0
+    for r, c in revealed:
+        mask |= 1 << (r * 4 + c)
+    key = ('/'.join(guess_rows), '/'.join(fb_rows), mask)
+    with ATTEMPT_FRAGMENTS_LOCK:
+        html = ATTEMPT_FRAGMENTS.get(key)
+        if html is not None:
+            ATTEMPT_FRAGMENTS.move_to_end(key)
+    metrics.cache_lookup('attempt_fragment', html is not None)
+    if html is None:
+        html = Markup(render_template('attempt_grid.html', guess_rows=guess_rows,
+                                      fb_rows=fb_rows, revealed=revealed))
+        with ATTEMPT_FRAGMENTS_LOCK:
+            ATTEMPT_FRAGMENTS[key] = html
+            while len(ATTEMPT_FRAGMENTS) > FRAGMENT_CACHE_SIZE:
+                ATTEMPT_FRAGMENTS.popitem(last=False)
+    return html
+
+
 @app.route('/')
 def index():
     date_str, _seed = get_daily_seed()
@@ -260,6 +542,8 @@ def index():
     end_time = session.get('end_time')
     # show shake animation once if the last submission was incorrect
     shake = session.pop('shake', False)
+    # words of the last submission rejected as not in the word list
+    invalid_rows = session.pop('invalid_rows', [])
     
     # Compute final keyboard state server-side to avoid sending all attempts
     keyboard_state = {}  # letter -> ('G', 'Y', 'P', or '_')
@@ -282,48 +566,72 @@ def index():
                     if new_priority > current_priority['p']:
                         keyboard_state[letter] = {'fb': fb, 'p': new_priority}
     
-    return render_template('index.html', cube=cube, revealed=list(revealed),
-                           attempts=attempts, feedbacks=feedbacks,
-                           max_attempts=MAX_ATTEMPTS, solved=solved,
-                           shake=shake, guessed_letters=guessed_letters,
-                           start_time=start_time, end_time=end_time,
-                           game_mode=session.get('game_mode', 'daily'),
-                           daily_date=session.get('daily_date'),
-                           daily_date_display=daily_date_display,
-                           keyboard_state=keyboard_state)
+    with metrics.timed('render'):
+        attempt_fragments = [attempt_fragment(a, fb, revealed) for a, fb in zip(attempts, feedbacks)]
+        return render_template('index.html', cube=cube, revealed=list(revealed),
+                               attempts=attempts, feedbacks=feedbacks,
+                               attempt_fragments=attempt_fragments,
+                               max_attempts=MAX_ATTEMPTS, solved=solved,
+                               shake=shake, invalid_rows=invalid_rows,
+                               guessed_letters=guessed_letters,
+                               start_time=start_time, end_time=end_time,
+                               game_mode=session.get('game_mode', 'daily'),
+                               daily_date=session.get('daily_date'),
+                               daily_date_display=daily_date_display,
+                               keyboard_state=keyboard_state)
+
+
+def requested_locale():
+    """Locale asked for with `lang` (form or query string), else the session's.
+
+    None when the requested locale has no cube corpus.
+    """
+    lang = request.values.get('lang', '').strip().lower()
+    if not lang:
+        return current_locale()
+    return lang if locales.is_available(lang) else None
+
+
+def new_game_page(**context):
+    return render_template('new_game.html', locales=locales.available_locales(),
+                           locale=current_locale(), **context)
 
 
 @app.route('/new', methods=['GET', 'POST'])
 def new_game():
     if request.method == 'GET':
-        return render_template('new_game.html')
+        return new_game_page()
 
+    locale = requested_locale()
+    if locale is None:
+        return new_game_page(error="That language is not available."), 404
     level = request.form.get('level', 'hard').lower()
-    reveal_counts = {
-        'easy': 8,
-        'medium': 6,
-        'hard': 4,
-        'insane': 0,
-    }
-    reveal_count = reveal_counts.get(level, 4)
-
-    global RANDOM_CUBES_CACHE
-    cubes = get_cubes()
-    if not cubes:
+    reveal_count = REVEAL_COUNTS.get(level, 4)
+    # optional theme: a word the cube must contain, letters it must not
+    word = request.form.get('word', '').strip().lower()
+    avoid = ''.join(sorted(set(request.form.get('avoid', '').lower()) - {' ', ','}))
+    if word and (len(word) != 4 or not word.isalpha()) or avoid and not avoid.isalpha():
+        return new_game_page(error="Use a 4-letter word and letters only."), 400
+
+    if not get_cubes(locale):
         return "No cubes found. Please run main2.py to generate word_cubes.txt", 500
-    
-    # Less strict blocklist for random games
-    random_blocklist = ['dick', 'fuck', 'shit', 'cunt', 'whore']
-    if RANDOM_CUBES_CACHE is None:
-        RANDOM_CUBES_CACHE = filter_cubes(cubes, random_blocklist)
-    cubes = RANDOM_CUBES_CACHE
+    cubes = get_random_cubes(locale)
     if not cubes:
         return "No appropriate cubes found.", 500
-    
-    cube = random.choice(cubes)
+
+    if word or avoid:
+        mask = get_random_index(locale).matching([word] if word else (), avoid)
+        if not mask:
+            return new_game_page(word=word, avoid=avoid,
+                                 error="No cube matches that word and those letters."), 404
+        cube = cubes[nth_id(mask, random.randrange(mask.bit_count()))]
+    else:
+        # walk this player's own shuffle of the corpus so cubes don't repeat
+        index, session['deck'] = selection.draw(session.get('deck'), len(cubes))
+        cube = cubes[index]
     # reveal N random positions based on difficulty
-    all_pos = [(r, c) for r in range(4) for c in range(4)]
-    revealed = random.sample(all_pos, reveal_count) if reveal_count > 0 else []
+    revealed = choose_revealed(cube, reveal_count, locale=locale)
+    session['locale'] = locale
     session['cube'] = cube
     session['revealed'] = revealed
     session['game_mode'] = 'custom'
@@ -335,6 +643,10 @@ def new_game():
     session['guessed_letters'] = []
     session['start_time'] = time.time()
     session['end_time'] = None
+    session['recorded'] = False
+    session['hinted'] = False
+    metrics.inc('wordcube_games_started_total', mode=metric_mode(level))
+    eventlog.log_start(level, cube)
     return redirect(url_for('index'))
 
 
@@ -352,12 +664,19 @@ def guess():
         if len(v) != 4 or not all(c.isalpha() or c == ' ' for c in v):
             return redirect(url_for('index'))
         guesses.append(v)
+    invalid = [g for i, g in enumerate(guesses) if not is_valid_row(g, cube[i])]
+    if invalid:
+        # not in the dictionary: reject without using up an attempt, and say why
+        session['invalid_rows'] = invalid
+        session['shake'] = True
+        return redirect(url_for('index'))
     # compute feedbacks with enhanced logic (G/Y/P/_)
     revealed = set(tuple(p) for p in session.get('revealed', []))
     attempts = session.get('attempts', [])
     feedbacks = session.get('feedbacks', [])
     
-    fbs = compute_feedback_all_rows(guesses, cube, revealed, attempts, feedbacks)
+    with metrics.timed('feedback'):
+        fbs = compute_feedback_all_rows(guesses, cube, revealed, attempts, feedbacks)
     
     attempts.append(guesses)
     feedbacks.append(fbs)
@@ -393,11 +712,14 @@ def guess():
                         if not remaining:
                             guessed_letters.append(letter)
     session['guessed_letters'] = guessed_letters
-    # solved if all green
-    if all(fb == 'G' * 4 for fb in fbs):
+    solved = all(fb == 'G' * 4 for fb in fbs)
+    eventlog.log_guess(session.get('difficulty', 'daily'), cube, len(attempts), guesses, fbs, solved)
+    if solved:
         session['solved'] = True
         if not session.get('end_time'):
             session['end_time'] = time.time()
+        metrics.inc('wordcube_games_solved_total', mode=metric_mode(session.get('difficulty', 'daily')))
+        record_result(solved=True)
     else:
         # trigger a one-time shake animation client-side
         session['shake'] = True
@@ -410,15 +732,186 @@ def reveal_answer():
     if 'cube' not in session:
         return redirect(url_for('new_game'))
     session['revealed'] = [(r, c) for r in range(4) for c in range(4)]
+    was_solved = session.get('solved')
     session['solved'] = True
     if not session.get('end_time'):
         session['end_time'] = time.time()
+    if not was_solved:
+        record_result(solved=False)
+        eventlog.log_reveal(session.get('difficulty', 'daily'), session['cube'], len(session.get('attempts', [])))
     return redirect(url_for('index'))
 
 
+@app.route('/hint')
+def hint():
+    """Remaining candidate count, plus a suggested letter with `?letter=1`.
+
+    A suggested letter marks the game as hinted, which keeps it out of /stats.
+    """
+    if 'cube' not in session:
+        return jsonify({'error': 'no game in progress'}), 400
+    cube = session['cube']
+    revealed = set(tuple(p) for p in session.get('revealed', []))
+    attempts = session.get('attempts', [])
+    feedbacks = session.get('feedbacks', [])
+    with metrics.timed('hint'):
+        ids = consistent_cubes(cube, revealed, attempts, feedbacks)
+    result = {'remaining': len(ids)}
+    if request.args.get('letter') and ids and not session.get('solved'):
+        index = get_solver_index()
+        mask = 0
+        for i in ids:
+            mask |= 1 << i
+        greens = {(r, c) for fb_rows in feedbacks
+                  for r, fb_row in enumerate(fb_rows)
+                  for c, fb in enumerate(fb_row) if fb == 'G'}
+        # suggest the open cell the remaining candidates agree on most
+        best = None
+        for r in range(4):
+            for c in range(4):
+                if (r, c) in revealed or (r, c) in greens:
+                    continue
+                ch, n = index.letter_counts(mask, r, c).most_common(1)[0]
+                if best is None or n > best[3]:
+                    best = (r, c, ch, n)
+        if best is not None:
+            r, c, ch, n = best
+            result['suggestion'] = {'row': r, 'col': c, 'letter': ch, 'confidence': n / len(ids)}
+            session['hinted'] = True
+    return jsonify(result)
+
+
+def endless_serializer():
+    return URLSafeSerializer(app.secret_key, salt='endless-board')
+
+
+def endless_board(locale, index, cube, revealed):
+    """Client payload for one endless board: a signed token and the revealed letters.
+
+    The token names the cube by corpus index plus its crc32 (so a regenerated
+    corpus invalidates it) and carries the revealed cells as a 16-bit mask;
+    no solution letters are in it. `revealed` is a 16-character string with
+    '.' for hidden cells.
+    """
+    mask = 0
+    for r, c in revealed:
+        mask |= 1 << (r * 4 + c)
+    token = endless_serializer().dumps([locale, index, eventlog.cube_id(cube), mask])
+    cells = ''.join(ch if mask >> i & 1 else '.' for i, ch in enumerate(''.join(cube)))
+    return {'token': token, 'revealed': cells}
+
+
+def load_endless_board(token):
+    """(locale, cube, revealed) for a token from endless_board, or None if it is not valid now."""
+    try:
+        locale, index, cid, mask = endless_serializer().loads(token)
+    except (BadSignature, TypeError, ValueError):
+        return None
+    if not locales.is_available(locale):
+        return None
+    cubes = get_random_cubes(locale)
+    if not 0 <= index < len(cubes) or eventlog.cube_id(cubes[index]) != cid:
+        return None
+    revealed = {(i // 4, i % 4) for i in range(16) if mask >> i & 1}
+    return locale, cubes[index], revealed
+
+
+@app.route('/endless')
+def endless():
+    level = request.args.get('level', 'medium').lower()
+    if level not in REVEAL_COUNTS or level == 'daily':
+        level = 'medium'
+    return render_template('endless.html', level=level, max_attempts=MAX_ATTEMPTS)
+
+
+@app.route('/endless/next')
+def endless_next():
+    """The next `n` endless boards (default 3), drawn from this player's deck."""
+    locale = requested_locale()
+    if locale is None:
+        return jsonify({'error': 'that language is not available'}), 404
+    level = request.args.get('level', 'medium').lower()
+    reveal_count = REVEAL_COUNTS.get(level, REVEAL_COUNTS['medium'])
+    n = max(1, min(request.args.get('n', 3, type=int), ENDLESS_BATCH_MAX))
+    cubes = get_random_cubes(locale)
+    if not cubes:
+        return jsonify({'error': 'no cubes available'}), 500
+    deck = session.get('deck')
+    boards = []
+    for _ in range(n):
+        index, deck = selection.draw(deck, len(cubes))
+        cube = cubes[index]
+        boards.append(endless_board(locale, index, cube, choose_revealed(cube, reveal_count, locale=locale)))
+    session['deck'] = deck
+    return jsonify({'boards': boards})
+
+
+@app.route('/endless/guess', methods=['POST'])
+def endless_guess():
+    """Feedback for the newest of `attempts` on an endless board.
+
+    Endless games keep no server state: the client posts the board token and
+    every attempt so far, and earlier feedback is replayed to score the new
+    one. The solution comes back once the board is solved, out of attempts,
+    or given up with `give_up`.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'expected a JSON object'}), 400
+    board = load_endless_board(data.get('token'))
+    if board is None:
+        return jsonify({'error': 'this board is no longer available'}), 410
+    locale, cube, revealed = board
+    if data.get('give_up'):
+        return jsonify({'solution': cube})
+    attempts = data.get('attempts')
+    if (not isinstance(attempts, list) or not 1 <= len(attempts) <= MAX_ATTEMPTS
+            or not all(isinstance(a, list) and len(a) == 4 and all(
+                isinstance(v, str) and len(v) == 4 and all(c.isalpha() or c == ' ' for c in v)
+                for v in a) for a in attempts)):
+        return jsonify({'error': f'attempts must be 1 to {MAX_ATTEMPTS} lists of four 4-letter rows'}), 400
+    attempts = [[v.lower() for v in a] for a in attempts]
+    guesses = attempts[-1]
+    bad_rows = [i for i, g in enumerate(guesses) if not is_valid_row(g, cube[i], locale)]
+    if bad_rows:
+        return jsonify({'error': 'not a word', 'rows': bad_rows}), 422
+    feedbacks = []
+    with metrics.timed('feedback'):
+        for i, rows in enumerate(attempts):
+            feedbacks.append(compute_feedback_all_rows(rows, cube, revealed, attempts[:i], feedbacks))
+    solved = all(fb == 'G' * 4 for fb in feedbacks[-1])
+    result = {'feedback': feedbacks[-1], 'solved': solved, 'attempt': len(attempts)}
+    if solved:
+        metrics.inc('wordcube_games_solved_total', mode='endless')
+    if solved or len(attempts) >= MAX_ATTEMPTS:
+        result['solution'] = cube
+    return jsonify(result)
+
+
+@app.route('/stats')
+def stats():
+    """Solve rate and attempts/time histograms for today or one of the last STATS_DAYS days.
+
+    Only those days and results.MODES are accepted, so the snapshot cache
+    (and the queries behind it) stay bounded whatever clients ask for.
+    """
+    today = datetime.strptime(get_daily_seed()[0], '%Y-%m-%d').date()
+    days = [(today - timedelta(days=i)).isoformat() for i in range(STATS_DAYS)]
+    day = request.args.get('day') or days[0]
+    mode = request.args.get('mode') or None
+    if day not in days:
+        return jsonify({'error': f"day must be one of {', '.join(days)}"}), 400
+    if mode is not None and mode not in results.MODES:
+        return jsonify({'error': f"mode must be one of {', '.join(results.MODES)}"}), 400
+    return jsonify(results.daily_stats(day, mode))
+
+
 @app.route('/daily')
 def daily_game():
-    result = start_daily_game()
+    locale = requested_locale()
+    if locale is None:
+        return "That language is not available.", 404
+    result = start_daily_game(locale)
     if result is not None:
         return result
     return redirect(url_for('index'))
@@ -0,0 +1,68 @@
+"""A bounded queue drained by one daemon thread, for writes kept off the request path.
+
+Used by `results.py` (SQLite rows) and `eventlog.py` (binary records).
+`put()` never blocks: when the writer falls behind and the queue is full the
+item is dropped and counted in `dropped`. The thread starts on the first
+`put()` and writes everything that has queued up since its last write as one
+batch, so batches grow with load without delaying writes when the app is
+quiet.
+"""
+import queue
+import threading
+
+
+class BackgroundWriter:
+    """Drains queued items in batches into a sink opened on the writer thread.
+
+    `open_sink()` is called once, on the writer thread (SQLite connections
+    must stay on the thread that made them). `write(sink, batch)` writes a
+    list of items; an exception listed in `errors` drops that batch with a
+    message instead of stopping the thread.
+    """
+
+    def __init__(self, name, open_sink, write, max_queue, max_batch=None, errors=(OSError,)):
+        self.name = name
+        self.open_sink = open_sink
+        self.write = write
+        self.max_batch = max_batch
+        self.errors = errors
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, item):
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Block until everything queued so far is written."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        sink = self.open_sink()
+        while True:
+            batch = [self._queue.get()]
+            while self.max_batch is None or len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.write(sink, batch)
+            except self.errors as e:
+                print(f"{self.name}: dropped {len(batch)} items: {e}")
+            for _ in batch:
+                self._queue.task_done()
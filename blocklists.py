@@ -0,0 +1,13 @@
+"""Words that must not appear in served cubes.
+
+A cube is rejected when any of these strings occurs inside one of its words.
+`app.py` filters the corpus with them at request time, and
+`generators/generate_cubes.py` can apply them during the search so such cubes
+are never generated.
+"""
+
+# Stricter blocklist for daily cube
+DAILY_BLOCKLIST = ['anal', 'anus', 'cock', 'damn', 'hell', 'slut', 'dick', 'fuck', 'shit', 'cunt', 'whore']
+
+# Less strict blocklist for random games
+RANDOM_BLOCKLIST = ['dick', 'fuck', 'shit', 'cunt', 'whore']
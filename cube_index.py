@@ -0,0 +1,116 @@
+"""Bitmap index over a cube corpus for narrowing candidate solutions.
+
+Cube ids are positions in the list handed to `CubeIndex`. Sets of cubes are
+Python ints used as bitmaps (bit `i` set means cube `i` is in the set), so
+intersections are single `&` operations regardless of corpus size.
+
+Postings are kept per (cell, letter), per letter and per word (each row and
+column), which serves both the solver (`narrow`) and themed game selection
+(`matching`).
+"""
+from collections import Counter
+
+CELLS = [(r, c) for r in range(4) for c in range(4)]
+
+
+def iter_ids(mask):
+    """Yield the cube ids set in `mask`, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def nth_id(mask, n):
+    """The `n`-th (0-based) cube id set in `mask`, without listing them all."""
+    offset = 0
+    chunk_bits = 1024
+    chunk_mask = (1 << chunk_bits) - 1
+    while mask:
+        chunk = mask & chunk_mask
+        count = chunk.bit_count()
+        if n < count:
+            for i in iter_ids(chunk):
+                if n == 0:
+                    return offset + i
+                n -= 1
+        n -= count
+        mask >>= chunk_bits
+        offset += chunk_bits
+    raise IndexError('mask has fewer set bits than requested')
+
+
+class CubeIndex:
+    def __init__(self, cubes):
+        self.cubes = cubes
+        self.all = (1 << len(cubes)) - 1
+        # cell[r * 4 + c][letter] -> cubes with `letter` at (r, c)
+        self.cell = [{} for _ in CELLS]
+        # letter -> cubes containing `letter` anywhere
+        self.letter = {}
+        # word -> cubes with `word` as a row or a column
+        self.word = {}
+        for i, cube in enumerate(cubes):
+            bit = 1 << i
+            cols = [''.join(row[c] for row in cube) for c in range(4)]
+            for w in (*cube, *cols):
+                self.word[w] = self.word.get(w, 0) | bit
+            for r, c in CELLS:
+                ch = cube[r][c]
+                pos = self.cell[r * 4 + c]
+                pos[ch] = pos.get(ch, 0) | bit
+                self.letter[ch] = self.letter.get(ch, 0) | bit
+
+    def __len__(self):
+        return len(self.cubes)
+
+    def at(self, r, c, ch):
+        return self.cell[r * 4 + c].get(ch, 0)
+
+    def matching(self, words=(), avoid='', mask=None):
+        """Bitmap of cubes with every word in `words` as a row or column and
+        none of the letters in `avoid` anywhere."""
+        if mask is None:
+            mask = self.all
+        for w in words:
+            mask &= self.word.get(w, 0)
+        for ch in avoid:
+            mask &= ~self.letter.get(ch, 0)
+        return mask
+
+    def narrow(self, known, attempts, feedbacks):
+        """Bitmap of cubes agreeing with the letter-level facts of a game.
+
+        `known` maps (row, col) to letters the player can see (revealed cells).
+        Each green in `feedbacks` pins its letter to that cell; any other
+        feedback rules the letter out at that cell, and Y/P additionally
+        require the letter somewhere on the board. This is a necessary
+        condition only; callers wanting an exact answer re-check the survivors
+        against the real feedback rules.
+        """
+        mask = self.all
+        for (r, c), ch in known.items():
+            mask &= self.at(r, c, ch)
+        for attempt, fb_rows in zip(attempts, feedbacks):
+            for r, (guess_row, fb_row) in enumerate(zip(attempt, fb_rows)):
+                for c, (ch, fb) in enumerate(zip(guess_row, fb_row)):
+                    if ch == ' ' or (r, c) in known:
+                        continue
+                    if fb == 'G':
+                        mask &= self.at(r, c, ch)
+                    else:
+                        mask &= ~self.at(r, c, ch)
+                        if fb in ('Y', 'P'):
+                            mask &= self.letter.get(ch, 0)
+                if not mask:
+                    return 0
+        return mask
+
+    def letter_counts(self, mask, r, c):
+        """Counter of letters at (r, c) across the cubes in `mask`."""
+        counts = Counter()
+        for ch, cubes in self.cell[r * 4 + c].items():
+            n = (mask & cubes).bit_count()
+            if n:
+                counts[ch] = n
+        return counts
@@ -0,0 +1,38 @@
+"""Reading and writing cube files.
+
+A cube file holds one block per cube: four rows of space-separated letters,
+with a blank line after each block. The app and the scripts in `generators/`
+read and write this format through here.
+"""
+import os
+
+
+def parse_cubes(text):
+    """Cubes (lists of four lowercase 4-letter rows) in a cube file's text; malformed blocks are skipped."""
+    cubes = []
+    for block in text.split('\n\n'):
+        rows = [line.replace(' ', '').lower() for line in block.splitlines() if line.strip()]
+        if len(rows) == 4 and all(len(r) == 4 for r in rows):
+            cubes.append(rows)
+    return cubes
+
+
+def load_cubes(path):
+    with open(path, 'r') as f:
+        return parse_cubes(f.read())
+
+
+def write_cubes(cubes, path):
+    """Write `cubes` to `path` through a temporary file and a rename.
+
+    Readers (running app workers) see either the old file or the new one,
+    never a half-written one.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        for cube in cubes:
+            for row in cube:
+                f.write(' '.join(row) + '\n')
+            f.write('\n')
+    os.replace(tmp, path)
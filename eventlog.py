@@ -0,0 +1,178 @@
+"""Opt-in append-only binary log of game starts, guesses and give-ups.
+
+Set `WORDCUBE_EVENT_LOG_DIR` to enable it. Each worker process appends to its
+own `events-<pid>-<n>.bin` files there and starts a new file once one reaches
+`WORDCUBE_EVENT_LOG_MAX_BYTES` (default 64 MiB). Requests only pack a record
+and put it on a queue; a `background.BackgroundWriter` thread writes whatever
+has queued up in one `write()` call. When the writer falls behind, records
+are dropped rather than blocking.
+
+File layout (little endian)::
+
+    header:  b'WCEV'  u16 version  u16 record size
+    record:  u32 unix seconds  u16 milliseconds  u8 kind  u8 mode
+             u8 attempt  u8 flags  u32 cube id  10 bytes rows  u32 feedback
+
+The cube id is the crc32 of the cube's rows joined with '/', which is stable
+across corpus regenerations (see `cube_id`). The rows hold 16 letters at 5 bits
+each (0 = blank, 1-26 = a-z), and the feedback holds 16 cells at 2 bits each
+(see `FEEDBACK`), both row-major starting from the lowest bits. Start events
+carry empty rows.
+
+`generators/analyze_events.py` streams these files into per-cube and per-word
+statistics.
+"""
+import atexit
+import os
+import struct
+import time
+import zlib
+
+from background import BackgroundWriter
+
+LOG_DIR = os.environ.get('WORDCUBE_EVENT_LOG_DIR', '')
+ENABLED = bool(LOG_DIR)
+MAX_BYTES = int(os.environ.get('WORDCUBE_EVENT_LOG_MAX_BYTES', str(64 << 20)))
+QUEUE_SIZE = 50000
+
+MAGIC = b'WCEV'
+VERSION = 1
+HEADER = struct.Struct('<4sHH')
+RECORD = struct.Struct('<IHBBBBI10sI')
+
+START, GUESS, REVEAL = 0, 1, 2
+KINDS = {START: 'start', GUESS: 'guess', REVEAL: 'reveal'}
+MODES = ('daily', 'easy', 'medium', 'hard', 'insane')
+UNKNOWN_MODE = 255
+FEEDBACK = '_GYP'
+FLAG_SOLVED = 1
+
+_FEEDBACK_CODES = {ch: i for i, ch in enumerate(FEEDBACK)}
+_EMPTY_ROWS = bytes(10)
+
+
+def cube_id(cube):
+    return zlib.crc32('/'.join(cube).encode('ascii'))
+
+
+def pack_rows(rows):
+    value = 0
+    for i, ch in enumerate(''.join(rows)):
+        code = ord(ch) - 96 if 'a' <= ch <= 'z' else 0
+        value |= code << (5 * i)
+    return value.to_bytes(10, 'little')
+
+
+def unpack_rows(data):
+    value = int.from_bytes(data, 'little')
+    letters = [chr(96 + code) if (code := (value >> (5 * i)) & 31) else ' ' for i in range(16)]
+    return [''.join(letters[r * 4:r * 4 + 4]) for r in range(4)]
+
+
+def pack_feedback(fb_rows):
+    value = 0
+    for i, ch in enumerate(''.join(fb_rows)):
+        value |= _FEEDBACK_CODES.get(ch, 0) << (2 * i)
+    return value
+
+
+def unpack_feedback(value):
+    cells = ''.join(FEEDBACK[(value >> (2 * i)) & 3] for i in range(16))
+    return [cells[r * 4:r * 4 + 4] for r in range(4)]
+
+
+def pack(kind, mode, cube, attempt=0, rows=None, fb_rows=None, solved=False, now=None):
+    now = time.time() if now is None else now
+    seconds = int(now)
+    mode_code = MODES.index(mode) if mode in MODES else UNKNOWN_MODE
+    return RECORD.pack(seconds, int((now - seconds) * 1000), kind, mode_code,
+                       min(attempt, 255), FLAG_SOLVED if solved else 0, cube_id(cube),
+                       pack_rows(rows) if rows else _EMPTY_ROWS,
+                       pack_feedback(fb_rows) if fb_rows else 0)
+
+
+def log_start(mode, cube):
+    if ENABLED:
+        _put(pack(START, mode, cube))
+
+
+def log_guess(mode, cube, attempt, rows, fb_rows, solved):
+    if ENABLED:
+        _put(pack(GUESS, mode, cube, attempt, rows, fb_rows, solved))
+
+
+def log_reveal(mode, cube, attempt):
+    if ENABLED:
+        _put(pack(REVEAL, mode, cube, attempt))
+
+
+class _RotatingFile:
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.seq = 0
+        self.f = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _open(self):
+        # a restarted worker can be handed a pid seen before; never append to its files
+        while True:
+            path = os.path.join(self.directory, f'events-{os.getpid()}-{self.seq}.bin')
+            self.seq += 1
+            try:
+                self.f = open(path, 'xb')
+            except FileExistsError:
+                continue
+            self.f.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+            return
+
+    def write(self, data):
+        if self.f is None or self.f.tell() + len(data) > self.max_bytes:
+            if self.f is not None:
+                self.f.close()
+            self._open()
+        self.f.write(data)
+        self.f.flush()
+
+
+def _write(out, batch):
+    out.write(b''.join(batch))
+
+
+def new_writer():
+    """Writer thread for queued records; it opens LOG_DIR when it starts."""
+    return BackgroundWriter('event-log', lambda: _RotatingFile(LOG_DIR, MAX_BYTES), _write, QUEUE_SIZE)
+
+
+_writer = new_writer()
+
+
+def _put(record):
+    _writer.put(record)
+
+
+def flush():
+    """Block until everything queued so far is written."""
+    _writer.flush()
+
+
+atexit.register(flush)
+
+
+def read_records(path, chunk_records=32768):
+    """Yield raw record tuples from one log file, reading it in fixed-size chunks."""
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return
+        magic, version, size = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or size != RECORD.size:
+            raise ValueError(f"{path} is not a version {VERSION} event log")
+        while True:
+            chunk = f.read(RECORD.size * chunk_records)
+            # a worker killed mid-write can leave a partial last record
+            usable = len(chunk) - len(chunk) % RECORD.size
+            if usable:
+                yield from RECORD.iter_unpack(chunk[:usable])
+            if len(chunk) < RECORD.size * chunk_records:
+                return
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Per-cube and per-word statistics from the binary event log (see `eventlog.py`).
+
+Usage::
+
+    python3 generators/analyze_events.py events/ [--cubes word_lists/word_cubes.txt]
+                                          [--top 20] [--min-starts 5] [--json OUT]
+
+Files are streamed in fixed-size chunks, so memory stays flat however large
+the logs are: it grows only with the number of distinct cubes and guessed
+words. Guessed rows are counted by their packed 20-bit letter code and
+decoded to words only for the report. Cube ids are crc32 hashes; pass the
+cube file to print cubes instead of ids.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+from cubefile import load_cubes  # noqa: E402
+from eventlog import GUESS, KINDS, MODES, REVEAL, START, FLAG_SOLVED, cube_id, read_records  # noqa: E402
+
+# feedback byte of a row that is all green ('G' is code 1 in every 2-bit cell)
+ALL_GREEN = 0b01010101
+ROW_BITS = 20
+
+
+def decode_row(code):
+    letters = [(code >> (5 * i)) & 31 for i in range(4)]
+    if not all(letters):
+        return None
+    return ''.join(chr(96 + x) for x in letters)
+
+
+def log_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(glob.glob(os.path.join(path, 'events-*.bin')))
+        else:
+            yield path
+
+
+class EventStats:
+    def __init__(self):
+        self.records = 0
+        self.kinds = Counter()
+        # mode code -> [starts, solves]
+        self.modes = defaultdict(lambda: [0, 0])
+        # cube id -> [starts, guesses, solves, reveals, attempts summed over solves]
+        self.cubes = defaultdict(lambda: [0, 0, 0, 0, 0])
+        # 20-bit row code -> [times guessed, times all green]
+        self.rows = defaultdict(lambda: [0, 0])
+        # attempts used -> solved games
+        self.attempts = Counter()
+
+    def add_file(self, path):
+        cubes, rows, modes = self.cubes, self.rows, self.modes
+        n = 0
+        for _sec, _ms, kind, mode, attempt, flags, cid, packed, fb in read_records(path):
+            n += 1
+            cube = cubes[cid]
+            if kind == GUESS:
+                cube[1] += 1
+                value = int.from_bytes(packed, 'little')
+                for r in range(4):
+                    row = rows[(value >> (ROW_BITS * r)) & 0xFFFFF]
+                    row[0] += 1
+                    if ((fb >> (8 * r)) & 0xFF) == ALL_GREEN:
+                        row[1] += 1
+                if flags & FLAG_SOLVED:
+                    cube[2] += 1
+                    cube[4] += attempt
+                    modes[mode][1] += 1
+                    self.attempts[attempt] += 1
+            elif kind == START:
+                cube[0] += 1
+                modes[mode][0] += 1
+            elif kind == REVEAL:
+                cube[3] += 1
+            self.kinds[kind] += 1
+        self.records += n
+        return n
+
+    def report(self, names=None, top=20, min_starts=5):
+        names = names or {}
+        words = {}
+        for code, (guessed, green) in self.rows.items():
+            word = decode_row(code)
+            if word is not None:
+                words[word] = (guessed, green)
+        cube_rows = []
+        for cid, (starts, guesses, solves, reveals, used) in self.cubes.items():
+            cube_rows.append({
+                'cube': names.get(cid, f'{cid:08x}'),
+                'starts': starts,
+                'guesses': guesses,
+                'solves': solves,
+                'reveals': reveals,
+                'solve_rate': solves / starts if starts else None,
+                'mean_attempts': used / solves if solves else None,
+            })
+        rated = [c for c in cube_rows if c['starts'] and c['starts'] >= min_starts]
+        return {
+            'records': self.records,
+            'events': {KINDS.get(k, str(k)): n for k, n in sorted(self.kinds.items())},
+            'modes': {(MODES[m] if m < len(MODES) else 'unknown'): {
+                'starts': s, 'solves': v, 'solve_rate': v / s if s else None}
+                for m, (s, v) in sorted(self.modes.items())},
+            'attempts_when_solved': {str(k): n for k, n in sorted(self.attempts.items())},
+            'hardest_cubes': sorted(rated, key=lambda c: (c['solve_rate'], -c['starts']))[:top],
+            'most_played_cubes': sorted(cube_rows, key=lambda c: -c['starts'])[:top],
+            'most_guessed_words': [{'word': w, 'guessed': g, 'correct': c} for w, (g, c) in
+                                   sorted(words.items(), key=lambda kv: -kv[1][0])[:top]],
+            'distinct_words': len(words),
+            'distinct_cubes': len(cube_rows),
+        }
+
+
+def load_cube_names(path):
+    return {cube_id(rows): '/'.join(rows) for rows in load_cubes(path)}
+
+
+def print_report(report):
+    print(f"{report['records']} records: "
+          + ', '.join(f"{n} {kind}" for kind, n in report['events'].items()))
+    for mode, m in report['modes'].items():
+        rate = f"{m['solve_rate']:.1%}" if m['solve_rate'] is not None else '-'
+        print(f"  {mode:<8} {m['starts']} started, {m['solves']} solved ({rate})")
+    print("Attempts when solved: " + ' '.join(f"{k}:{n}" for k, n in report['attempts_when_solved'].items()))
+    print("Hardest cubes:")
+    for c in report['hardest_cubes']:
+        mean = f"{c['mean_attempts']:.1f}" if c['mean_attempts'] else '-'
+        print(f"  {c['cube']}  solved {c['solve_rate']:.0%} of {c['starts']}, mean attempts {mean}")
+    print(f"Most guessed words ({report['distinct_words']} distinct):")
+    for w in report['most_guessed_words']:
+        print(f"  {w['word']}  {w['guessed']} guesses, {w['correct']} correct")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='+', help='log files or directories of events-*.bin')
+    parser.add_argument('--cubes', help='cube file used to name cube ids')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--min-starts', type=int, default=5,
+                        help='ignore cubes started fewer times when ranking the hardest')
+    parser.add_argument('--json', metavar='OUT', help='also write the full report as JSON')
+    args = parser.parse_args()
+
+    stats = EventStats()
+    start = time.perf_counter()
+    for path in log_files(args.paths):
+        stats.add_file(path)
+    elapsed = time.perf_counter() - start
+    print(f"Read {stats.records} records in {elapsed:.1f}s", file=sys.stderr)
+
+    report = stats.report(load_cube_names(args.cubes) if args.cubes else None, args.top, args.min_starts)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
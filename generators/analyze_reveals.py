@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Find reveal patterns that pin down each cube in `word_lists/word_cubes.txt`.
+
+For every reveal size used by the app (4 for hard/daily, 6 for medium, 8 for
+easy) and every pattern of that many cells, count how many corpus cubes share
+the revealed letters with each cube. Patterns matching only a few cubes (by
+default: only the cube itself) are written to `word_lists/reveal_patterns.json`,
+which `app.py` draws from when starting games.
+
+The work is vectorized with numpy: each cube is encoded as 16 five-bit letter
+codes, a pattern's revealed letters pack into one int64 key per cube, and
+`np.unique` counts equal keys across the whole corpus in one call per pattern.
+
+Output format::
+
+    {"version": 1, "sizes": [4, 6, 8], "max_matches": 1,
+     "cubes": {"mime/idea/loss/else": {"4": [mask, ...], ...}, ...}}
+
+where each mask is a 16-bit int with bit `r * 4 + c` set for revealed cells.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from itertools import combinations
+
+import numpy as np
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import locales  # noqa: E402
+from cubefile import load_cubes  # noqa: E402
+
+REVEAL_SIZES = (4, 6, 8)
+
+
+def encode_cubes(cubes):
+    """(n_cubes, 16) int64 array of letter codes 1..26 in row-major order."""
+    flat = np.frombuffer(''.join(''.join(c) for c in cubes).encode('ascii'), dtype=np.uint8)
+    return (flat.reshape(len(cubes), 16) - ord('a') + 1).astype(np.int64)
+
+
+def match_counts(codes, cells):
+    """For each cube, how many cubes show the same letters at `cells`."""
+    if 5 * len(cells) > 63:
+        # the packed key would overflow int64; compare the letter columns instead
+        _, inverse, counts = np.unique(codes[:, list(cells)], axis=0, return_inverse=True,
+                                       return_counts=True)
+        return counts[inverse.ravel()]
+    key = np.zeros(codes.shape[0], dtype=np.int64)
+    for j, cell in enumerate(cells):
+        key |= codes[:, cell] << (5 * j)
+    _, inverse, counts = np.unique(key, return_inverse=True, return_counts=True)
+    return counts[inverse.ravel()]
+
+
+def _collect(codes, masks, patterns, limit, keep, rng, subset=None):
+    """Reservoir-sample up to `keep` patterns per cube with counts <= `limit`.
+
+    Memory stays at O(n_cubes * keep) however many patterns are scanned. Also
+    returns the smallest match count seen per cube.
+    """
+    n = codes.shape[0] if subset is None else len(subset)
+    kept = np.full((n, keep), -1, dtype=np.int64)
+    seen = np.zeros(n, dtype=np.int64)
+    best = np.full(n, np.iinfo(np.int32).max, dtype=np.int64)
+    for p, cells in enumerate(patterns):
+        counts = match_counts(codes, cells)
+        if subset is not None:
+            counts = counts[subset]
+        np.minimum(best, counts, out=best)
+        hit = np.flatnonzero(counts <= limit)
+        if not len(hit):
+            continue
+        slot = seen[hit]
+        # classic reservoir: the k-th hit replaces a random slot with prob keep/k
+        replace = np.where(slot < keep, slot, rng.integers(0, slot + 1))
+        ok = replace < keep
+        kept[hit[ok], replace[ok]] = masks[p]
+        seen[hit] += 1
+    return kept, best
+
+
+def analyze(cubes, sizes=REVEAL_SIZES, max_matches=1, keep=32, seed=0, progress=True):
+    """Return {cube_key: {size: [mask, ...]}} of the most selective patterns.
+
+    Cubes with no pattern matching at most `max_matches` cubes fall back to
+    the patterns achieving their own minimum count.
+    """
+    codes = encode_cubes(cubes)
+    n = len(cubes)
+    rng = np.random.default_rng(seed)
+    table = {'/'.join(c): {} for c in cubes}
+
+    for size in sizes:
+        patterns = list(combinations(range(16), size))
+        masks = np.array([sum(1 << cell for cell in p) for p in patterns], dtype=np.int64)
+        start = time.perf_counter()
+        kept, best = _collect(codes, masks, patterns, max_matches, keep, rng)
+        missing = np.flatnonzero(best > max_matches)
+        if len(missing):
+            extra, _ = _collect(codes, masks, patterns, best[missing], keep, rng, subset=missing)
+            kept[missing] = extra
+        if progress:
+            print(f"size {size}: {len(patterns)} patterns x {n} cubes in {time.perf_counter() - start:.1f}s, "
+                  f"{n - len(missing)}/{n} cubes have a pattern matching <= {max_matches} cubes")
+        for i, cube in enumerate(cubes):
+            row = kept[i]
+            table['/'.join(cube)][str(size)] = sorted(int(m) for m in row[row >= 0])
+    return table
+
+
+def main():
+    base = os.path.dirname(__file__)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lang', default=locales.DEFAULT_LOCALE,
+                        help='locale whose corpus to analyze (sets the default --cubes and --out)')
+    parser.add_argument('--cubes')
+    parser.add_argument('--out')
+    parser.add_argument('--max-matches', type=int, default=1,
+                        help='keep patterns matching at most this many cubes (default 1: unique)')
+    parser.add_argument('--keep', type=int, default=32,
+                        help='patterns kept per cube and reveal size')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    try:
+        wordlists_dir = locales.locale_dir(args.lang, os.path.normpath(os.path.join(base, '..', 'word_lists')))
+    except ValueError as e:
+        parser.error(str(e))
+    args.cubes = args.cubes or os.path.join(wordlists_dir, 'word_cubes.txt')
+    args.out = args.out or os.path.join(wordlists_dir, 'reveal_patterns.json')
+
+    cubes = load_cubes(args.cubes)
+    print(f"Loaded {len(cubes)} cubes from {args.cubes}.")
+    table = analyze(cubes, max_matches=args.max_matches, keep=args.keep, seed=args.seed)
+    with open(args.out, 'w') as f:
+        json.dump({'version': 1, 'sizes': list(REVEAL_SIZES), 'max_matches': args.max_matches,
+                   'cubes': table}, f, separators=(',', ':'))
+    print(f"Wrote reveal patterns for {len(table)} cubes to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Collapse near-duplicate cubes (e.g. `acid/node/area/lead` vs `.../leaf`).
+
+Each cube is described by 24 features: its 8 row/column words and its 16
+(cell, letter) pairs. Two cubes are near duplicates when the Jaccard
+similarity of their feature sets reaches `threshold`; one letter swapped
+gives about 0.78, one row replaced about 0.45.
+
+Clustering is near linear in the number of cubes. MinHash signatures are
+computed with numpy, and locality-sensitive hashing puts cubes whose
+signatures agree on a whole band into the same bucket. Cubes are visited in
+input order. Each cube joins the first cluster leader it shares a bucket with
+and is similar enough to (checked with exact Jaccard), or else becomes a new
+leader. Every cluster member is therefore close to its leader, with no
+chaining through intermediate cubes. At most `MAX_PROBES` leaders are checked
+per cube, so hot buckets cannot make this quadratic.
+
+Usage::
+
+    python3 generators/dedupe_cubes.py [--threshold 0.4] [--keep 1] [IN [OUT]]
+
+`generate_cubes.py --dedupe THRESHOLD` runs the same stage right after the
+search.
+"""
+import argparse
+import os
+import sys
+import zlib
+
+import numpy as np
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+from cubefile import load_cubes, write_cubes  # noqa: E402
+
+# 32 bands of 3 rows: candidate pairs are likely above ~0.3 similarity
+BANDS = 32
+ROWS = 3
+MAX_PROBES = 64
+# a * h + b stays below 2**64 for 32-bit feature hashes
+PRIME = (1 << 31) - 1
+
+
+def features(cube):
+    n = len(cube)
+    cols = [''.join(cube[r][c] for r in range(n)) for c in range(n)]
+    out = {'w:' + w for w in cube + cols}
+    out.update(f'c{r}{c}:{cube[r][c]}' for r in range(n) for c in range(n))
+    return out
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def minhash_signatures(feature_sets, num_perm=BANDS * ROWS, seed=0, chunk=4096):
+    """(n_cubes, num_perm) uint64 MinHash signatures."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, PRIME, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, PRIME, size=num_perm, dtype=np.uint64)
+    width = max(len(f) for f in feature_sets)
+    hashes = np.zeros((len(feature_sets), width), dtype=np.uint64)
+    for i, feats in enumerate(feature_sets):
+        row = [zlib.crc32(f.encode()) for f in feats]
+        # pad with a repeat so padding never lowers the minimum
+        row += row[:1] * (width - len(row))
+        hashes[i] = row
+    sigs = np.empty((len(feature_sets), num_perm), dtype=np.uint64)
+    for start in range(0, len(feature_sets), chunk):
+        h = hashes[start:start + chunk, :, None]
+        sigs[start:start + chunk] = ((a * h + b) % PRIME).min(axis=1)
+    return sigs
+
+
+def cluster(cubes, threshold=0.4, seed=0):
+    """Cluster id (index of the cluster's leader cube) for every cube."""
+    if not cubes:
+        return []
+    feature_sets = [features(c) for c in cubes]
+    sigs = minhash_signatures(feature_sets, seed=seed)
+    buckets = [{} for _ in range(BANDS)]
+    ids = []
+    for i, feats in enumerate(feature_sets):
+        keys = [sigs[i, band * ROWS:(band + 1) * ROWS].tobytes() for band in range(BANDS)]
+        leader = None
+        probed = set()
+        for band, key in enumerate(keys):
+            for other in buckets[band].get(key, ()):
+                if other in probed:
+                    continue
+                probed.add(other)
+                if jaccard(feature_sets[other], feats) >= threshold:
+                    leader = other
+                    break
+                if len(probed) >= MAX_PROBES:
+                    break
+            if leader is not None or len(probed) >= MAX_PROBES:
+                break
+        if leader is None:
+            leader = i
+            for band, key in enumerate(keys):
+                buckets[band].setdefault(key, []).append(i)
+        ids.append(leader)
+    return ids
+
+
+def dedupe(cubes, threshold=0.4, keep=1, seed=0):
+    """Keep at most `keep` cubes per near-duplicate cluster, preserving order."""
+    kept = []
+    per_cluster = {}
+    for cube, cid in zip(cubes, cluster(cubes, threshold, seed)):
+        n = per_cluster.get(cid, 0)
+        if n < keep:
+            kept.append(cube)
+        per_cluster[cid] = n + 1
+    return kept
+
+
+def main():
+    base = os.path.dirname(__file__)
+    default = os.path.normpath(os.path.join(base, '..', 'word_lists', 'word_cubes.txt'))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('src', nargs='?', default=default)
+    parser.add_argument('dest', nargs='?', help='output file (default: replace SRC, atomically)')
+    parser.add_argument('--threshold', type=float, default=0.4,
+                        help='Jaccard similarity at which cubes count as duplicates')
+    parser.add_argument('--keep', type=int, default=1, help='cubes kept per cluster')
+    args = parser.parse_args()
+
+    cubes = load_cubes(args.src)
+    kept = dedupe(cubes, args.threshold, args.keep)
+    dest = args.dest or args.src
+    write_cubes(kept, dest)
+    print(f"Kept {len(kept)} of {len(cubes)} cubes ({len(cubes) - len(kept)} near duplicates) in {dest}")
+
+
+if __name__ == '__main__':
+    main()
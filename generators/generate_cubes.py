@@ -2,17 +2,48 @@
 """Generate 4x4 word cubes into `word_lists/word_cubes.txt`.
 
 This is a lightly modified copy of the project's `main2.py` that prefers
-`word_lists/word_list_wordfreq.txt` when present and writes output into
-`word_lists/word_cubes.txt`.
+`word_lists/word_list_wordfreq.bin` (or the `.txt` list) when present and
+writes output into `word_lists/word_cubes.txt`.
+
+`iter_word_cubes` enumerates cubes lazily and `find_word_cubes` collects
+them. `sample_word_cubes` (`--sample K`) draws random cubes from restarted
+randomized searches instead, which stays fast with large dictionaries where
+the full space runs to hundreds of millions of cubes.
 """
+import argparse
+import json
 import os
-from collections import defaultdict
+import random
+import sys
+import time
+from itertools import islice
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+from lexicon import Lexicon  # noqa: E402
+from wordlist import WordList  # noqa: E402
+from blocklists import DAILY_BLOCKLIST, RANDOM_BLOCKLIST  # noqa: E402
+from cubefile import write_cubes  # noqa: E402
+import locales  # noqa: E402
+
+# nodes one randomized restart may expand before giving up on its first row
+RESTART_NODES = 200
+# consecutive restarts without a new cube after which sampling stops
+MAX_FRUITLESS_RESTARTS = 1000
+
+BLOCKLISTS = {
+    'random': RANDOM_BLOCKLIST,
+    'daily': DAILY_BLOCKLIST,
+    'none': [],
+}
 
 
 def load_word_list(filename='word_list_10000.txt', top_n=None):
     tried = []
 
     def read_file(path):
+        if path.endswith('.bin'):
+            # binary lists are read lazily through mmap, already in rank order
+            return [w.lower() for w in WordList.load(path).words(length=4)]
         with open(path, 'r') as f:
             return [w.strip().lower() for w in f if w.strip()]
 
@@ -47,107 +78,481 @@ def load_word_list(filename='word_list_10000.txt', top_n=None):
     return words
 
 
-def build_prefix_map(words):
-    pm = defaultdict(list)
+class SearchStats:
+    """Counters collected by `find_word_cubes` when a stats object is passed.
+
+    Depth `k` is the number of rows already placed when a node is expanded;
+    `candidates` counts rows that passed prefix pruning at that depth and
+    `rejected` counts branches (partial rows) the pruning cut off.
+    """
+
+    def __init__(self, N=4, progress_interval=None, out=sys.stderr, progress_format='text'):
+        self.N = N
+        self.nodes = [0] * (N + 1)
+        self.candidates = [0] * N
+        self.rejected = [0] * N
+        self.cubes = 0
+        self.excluded_words = 0
+        self.outer_done = 0
+        self.outer_total = 0
+        # random sampling reports cubes found against a target instead of words done
+        self.sampling = False
+        self.target = None
+        self.time_budget = None
+        self.restarts = 0
+        self.progress_interval = progress_interval
+        self.out = out
+        self.progress_format = progress_format
+        self.start_time = None
+        self.end_time = None
+        self._next_report = None
+
+    def start(self, outer_total):
+        self.outer_total = outer_total
+        self.start_time = time.perf_counter()
+        if self.progress_interval:
+            self._next_report = self.start_time + self.progress_interval
+
+    def start_sampling(self, target=None, time_budget=None):
+        """Start timing a random sample of up to `target` cubes within `time_budget` seconds."""
+        self.sampling = True
+        self.target = target
+        self.time_budget = time_budget
+        self.start(0)
+
+    def finish(self):
+        self.end_time = time.perf_counter()
+        if self.progress_interval:
+            self.report_progress(self.end_time)
+
+    def elapsed(self, now=None):
+        end = now if now is not None else (self.end_time or time.perf_counter())
+        return end - self.start_time if self.start_time is not None else 0.0
+
+    def tick(self):
+        """Called after each outer word; prints progress when due."""
+        self.outer_done += 1
+        self._maybe_report()
+
+    def restart(self):
+        """Called after each random-sampling restart; prints progress when due."""
+        self.restarts += 1
+        self._maybe_report()
+
+    def _maybe_report(self):
+        if self._next_report is not None:
+            now = time.perf_counter()
+            if now >= self._next_report:
+                self.report_progress(now)
+                self._next_report = now + self.progress_interval
+
+    def _sampling_eta(self, elapsed):
+        """Seconds left: the time budget's remainder, or sooner if the target will be met first."""
+        etas = []
+        if self.time_budget is not None:
+            etas.append(max(0.0, self.time_budget - elapsed))
+        if self.target:
+            if self.cubes >= self.target:
+                etas.append(0.0)
+            elif self.cubes:
+                etas.append(elapsed * (self.target - self.cubes) / self.cubes)
+        return min(etas) if etas else None
+
+    def report_progress(self, now):
+        elapsed = self.elapsed(now)
+        rate = self.cubes / elapsed if elapsed else 0.0
+        if self.sampling:
+            eta = self._sampling_eta(elapsed)
+            if self.progress_format == 'json':
+                print(json.dumps({'event': 'progress', 'elapsed': round(elapsed, 2),
+                                  'cubes': self.cubes, 'target': self.target,
+                                  'restarts': self.restarts,
+                                  'eta': round(eta, 1) if eta is not None else None}),
+                      file=self.out, flush=True)
+                return
+            target = f"/{self.target}" if self.target else ''
+            eta_text = f"{eta:.0f}s" if eta is not None else '?'
+            print(f"[{elapsed:7.1f}s] {self.cubes}{target} cubes ({rate:.1f}/s), "
+                  f"{self.restarts} restarts, {sum(self.nodes)} nodes, ETA {eta_text}",
+                  file=self.out, flush=True)
+            return
+        frac = self.outer_done / self.outer_total if self.outer_total else 1.0
+        eta = elapsed * (1 - frac) / frac if frac else float('inf')
+        if self.progress_format == 'json':
+            # one object per line, for tools that follow a running search
+            print(json.dumps({'event': 'progress', 'elapsed': round(elapsed, 2),
+                              'words_done': self.outer_done, 'words_total': self.outer_total,
+                              'cubes': self.cubes, 'eta': round(eta, 1) if frac else None}),
+                  file=self.out, flush=True)
+            return
+        print(f"[{elapsed:7.1f}s] {self.outer_done}/{self.outer_total} words ({frac:.1%}), "
+              f"{self.cubes} cubes ({rate:.1f}/s), {sum(self.nodes)} nodes, ETA {eta:.0f}s",
+              file=self.out, flush=True)
+
+    def as_dict(self):
+        elapsed = self.elapsed()
+        depths = []
+        for k in range(self.N):
+            produced = self.candidates[k]
+            scanned = produced + self.rejected[k]
+            depths.append({
+                'depth': k,
+                'nodes': self.nodes[k],
+                'candidates': produced,
+                'rejected': self.rejected[k],
+                'prune_rate': self.rejected[k] / scanned if scanned else 0.0,
+            })
+        return {
+            'elapsed_seconds': elapsed,
+            'cubes': self.cubes,
+            'excluded_words': self.excluded_words,
+            'cubes_per_second': self.cubes / elapsed if elapsed else 0.0,
+            'nodes_total': sum(self.nodes),
+            'leaves': self.nodes[self.N],
+            'restarts': self.restarts,
+            'outer_words_done': self.outer_done,
+            'outer_words_total': self.outer_total,
+            'depths': depths,
+        }
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.as_dict(), f, indent=2)
+            f.write('\n')
+
+
+def allowed_words(words, blocklist=(), exclude=(), min_zipf=None, frequencies=None):
+    """Words that may appear anywhere in a cube, as a row or as a column.
+
+    Drops words containing a `blocklist` term, words listed in `exclude`, and,
+    when `min_zipf` is set, words whose Zipf frequency in `frequencies` is
+    below it (words missing from `frequencies` count as too rare).
+    """
+    exclude = set(exclude)
+    if min_zipf is not None and frequencies is None:
+        raise ValueError("min_zipf needs word frequencies (use the binary word list)")
+    out = []
     for w in words:
-        for i in range(5):
-            pm[w[:i]].append(w)
-    return pm
+        if w in exclude or any(term in w for term in blocklist):
+            continue
+        if min_zipf is not None and frequencies.get(w, float('-inf')) < min_zipf:
+            continue
+        out.append(w)
+    return out
+
+
+class _CubeSearch:
+    """Lexicon, trie-node cache and candidate generation shared by the searches."""
+
+    def __init__(self, words, N, stats, lexicon, blocklist, exclude, min_zipf, frequencies):
+        constrained = blocklist or exclude or min_zipf is not None
+        if constrained:
+            pool = allowed_words(words, blocklist, exclude, min_zipf, frequencies)
+            if stats is not None:
+                stats.excluded_words = len(words) - len(pool)
+            words = pool
+            if lexicon is not None:
+                lexicon = Lexicon.from_words(allowed_words(lexicon, blocklist, exclude, min_zipf, frequencies), N)
+        self.words = words
+        self.N = N
+        self.stats = stats
+        self.lex = lexicon if lexicon is not None else Lexicon.from_words(words, N)
+        # (lo, hi, depth) -> {letter: (lo, hi)}; bounded by the number of distinct prefixes
+        self._child_cache = {}
+
+    def children(self, lo, hi, depth):
+        key = (lo, hi, depth)
+        node = self._child_cache.get(key)
+        if node is None:
+            node = self._child_cache[key] = self.lex.children(lo, hi, depth)
+        return node
 
+    def start(self, w):
+        """(lexicon index, column ranges) for `w` as the first row, or None."""
+        lo, hi = self.lex.prefix_range(w)
+        if hi <= lo:
+            return None
+        root = self.children(0, len(self.lex), 0)
+        ranges = [root.get(ch) for ch in w]
+        return (lo, ranges) if all(ranges) else None
 
-def find_word_cubes(words, N=4, max_results=None):
-    prefix_map = build_prefix_map(words)
-    word_set = set(words)
-    results = []
+    def candidates(self, rows, ranges, used):
+        """Rows whose every letter extends the prefix of its column.
 
-    def candidates_for_next(rows):
+        Walks the lexicon trie letter by letter along the new row, following
+        only letters that the column trie also allows at that position.
+        """
+        N = self.N
+        lex = self.lex
+        children = self.children
         k = len(rows)
-        if k == 0:
-            return words
-        needed_prefixes = [''.join(rows[i][j] for i in range(k)) for j in range(N)]
-        pools = [(len(prefix_map.get(pref, [])), idx) for idx, pref in enumerate(needed_prefixes)]
-        pools.sort()
-        _, best_j = pools[0]
-        base_list = prefix_map.get(needed_prefixes[best_j], [])
+        last = k == N - 1
+        nexts = [children(lo, hi, k) for lo, hi in ranges]
         good = []
-        for w in base_list:
-            ok = True
-            for j in range(N):
-                pref = needed_prefixes[j] + w[j]
-                if pref not in prefix_map:
-                    ok = False
-                    break
-            if ok:
-                good.append(w)
+        cut = 0
+
+        def walk(j, lo, hi, new_ranges):
+            nonlocal cut
+            if j == N:
+                idx = lo
+                if idx in used:
+                    return
+                if last:
+                    # full-length ranges hold exactly one word: the column's index
+                    cols = {c_lo for c_lo, _c_hi in new_ranges}
+                    if len(cols) < N or idx in cols or not cols.isdisjoint(used):
+                        cut += 1
+                        return
+                good.append((idx, lex.word(idx), new_ranges))
+                return
+            allowed = nexts[j]
+            for ch, (sub_lo, sub_hi) in children(lo, hi, j).items():
+                col = allowed.get(ch)
+                if col is None:
+                    cut += 1
+                    continue
+                walk(j + 1, sub_lo, sub_hi, new_ranges + [col])
+
+        walk(0, 0, len(lex), [])
+        if self.stats is not None:
+            self.stats.candidates[k] += len(good)
+            self.stats.rejected[k] += cut
         return good
 
-    def backtrack(rows, used):
-        if max_results and len(results) >= max_results:
-            return
+
+def iter_word_cubes(words, N=4, stats=None, lexicon=None,
+                    blocklist=(), exclude=(), min_zipf=None, frequencies=None):
+    """Yield N x N squares whose rows and columns are distinct words, lazily.
+
+    Cubes come in the order of `words` (as first rows), then lexicon order.
+    Prefix pruning runs against `lexicon` (built from `words` when not given).
+    Each node carries the lexicon index range of every column prefix; the next
+    row is found by walking the lexicon trie along the row while intersecting
+    with the letters each column prefix can be extended by.
+
+    `blocklist`, `exclude` and `min_zipf` (see `allowed_words`) shrink the
+    word pool before the search, so forbidden words are never explored as
+    rows or completed as columns. Distinct rows and columns are enforced while
+    choosing the last row rather than on finished squares.
+
+    `stats` is finished when the generator is exhausted or closed.
+    """
+    search = _CubeSearch(words, N, stats, lexicon, blocklist, exclude, min_zipf, frequencies)
+    words = search.words
+    nodes = stats.nodes if stats is not None else None
+
+    def backtrack(rows, used, ranges):
         k = len(rows)
+        if nodes is not None:
+            nodes[k] += 1
         if k == N:
-            cols = [''.join(rows[r][c] for r in range(N)) for c in range(N)]
-            if all(c in word_set for c in cols) and len(set(rows + cols)) == 2 * N:
-                results.append(rows.copy())
+            if stats is not None:
+                stats.cubes += 1
+            yield rows.copy()
             return
+        for idx, candidate, new_ranges in search.candidates(rows, ranges, used):
+            used.add(idx)
+            rows.append(candidate)
+            yield from backtrack(rows, used, new_ranges)
+            rows.pop()
+            used.remove(idx)
 
-        for candidate in candidates_for_next(rows):
-            if candidate in used:
-                continue
-            used.add(candidate)
+    if stats is not None:
+        stats.start(len(words))
+        # the outer loop places row 0 itself
+        nodes[0] += 1
+        stats.candidates[0] += len(words)
+    try:
+        for w in words:
+            first = search.start(w)
+            if first is not None:
+                idx, ranges = first
+                yield from backtrack([w], {idx}, ranges)
+            if stats is not None:
+                stats.tick()
+    finally:
+        if stats is not None:
+            stats.finish()
+
+
+def find_word_cubes(words, N=4, max_results=None, stats=None, lexicon=None,
+                    blocklist=(), exclude=(), min_zipf=None, frequencies=None):
+    """List of the cubes `iter_word_cubes` yields, stopping after `max_results`."""
+    cubes = iter_word_cubes(words, N, stats, lexicon, blocklist, exclude, min_zipf, frequencies)
+    try:
+        return list(islice(cubes, max_results or None))
+    finally:
+        cubes.close()
+
+
+def iter_random_cubes(words, N=4, seed=None, time_budget=None, restart_nodes=RESTART_NODES,
+                      stats=None, lexicon=None, blocklist=(), exclude=(), min_zipf=None,
+                      frequencies=None, target=None):
+    """Yield distinct random cubes until `time_budget` seconds pass (or forever).
+
+    Each restart picks a random first row and runs a depth-first search with
+    every candidate list shuffled, giving up after `restart_nodes` nodes, so
+    no single dense or barren corner of the space holds the search. It takes
+    the first cube it reaches, which makes the sample roughly (not exactly)
+    uniform without enumerating the space. Stops early if many restarts in a
+    row find nothing new. `target`, the number of cubes the caller wants, is
+    only used to report progress.
+    """
+    rng = random.Random(seed)
+    search = _CubeSearch(words, N, stats, lexicon, blocklist, exclude, min_zipf, frequencies)
+    firsts = [(w, first) for w in search.words if (first := search.start(w)) is not None]
+    if not firsts:
+        return
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+    seen = set()
+    budget = 0
+
+    def descend(rows, used, ranges):
+        nonlocal budget
+        if len(rows) == N:
+            return rows.copy()
+        if budget <= 0:
+            return None
+        budget -= 1
+        if stats is not None:
+            stats.nodes[len(rows)] += 1
+        candidates = search.candidates(rows, ranges, used)
+        rng.shuffle(candidates)
+        for idx, candidate, new_ranges in candidates:
+            used.add(idx)
             rows.append(candidate)
-            backtrack(rows, used)
+            found = descend(rows, used, new_ranges)
             rows.pop()
-            used.remove(candidate)
+            used.remove(idx)
+            if found is not None or budget <= 0:
+                return found
+        return None
 
-    for w in words:
-        backtrack([w], {w})
-        if max_results and len(results) >= max_results:
-            break
+    if stats is not None:
+        stats.start_sampling(target, time_budget)
+    fruitless = 0
+    try:
+        while fruitless < MAX_FRUITLESS_RESTARTS:
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            w, (idx, ranges) = rng.choice(firsts)
+            budget = restart_nodes
+            cube = descend([w], {idx}, ranges)
+            if stats is not None:
+                stats.restart()
+            key = tuple(cube) if cube is not None else None
+            if key is None or key in seen:
+                fruitless += 1
+                continue
+            fruitless = 0
+            seen.add(key)
+            if stats is not None:
+                stats.cubes += 1
+            yield cube
+    finally:
+        if stats is not None:
+            stats.finish()
 
-    return results
+
+def sample_word_cubes(words, k, N=4, seed=None, time_budget=None, **kwargs):
+    """Up to `k` distinct random cubes; fewer if the time budget runs out first."""
+    cubes = iter_random_cubes(words, N, seed=seed, time_budget=time_budget, target=k, **kwargs)
+    try:
+        return list(islice(cubes, k))
+    finally:
+        cubes.close()
 
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--progress', type=float, metavar='SECONDS',
+                        help='print search progress with an ETA every SECONDS')
+    parser.add_argument('--progress-format', choices=('text', 'json'), default='text',
+                        help='json prints one progress object per line')
+    parser.add_argument('--lang', default=locales.DEFAULT_LOCALE,
+                        help='read word lists from and write cubes to this locale\'s directory '
+                             '(see locales.py)')
+    parser.add_argument('--out', metavar='PATH',
+                        help='output file (default word_lists[/LANG]/word_cubes.txt); written to a '
+                             'temporary file and renamed into place')
+    parser.add_argument('--stats', metavar='PATH',
+                        help='write search statistics as JSON to PATH')
+    parser.add_argument('--blocklist', choices=sorted(BLOCKLISTS), default='random',
+                        help='never use words containing these terms (default: random, the '
+                             'list random games are filtered with)')
+    parser.add_argument('--exclude', metavar='FILE',
+                        help='file of words (one per line) never to use')
+    parser.add_argument('--min-zipf', type=float,
+                        help='skip words rarer than this Zipf frequency (needs the binary word list)')
+    parser.add_argument('--top-n', type=int, default=1000,
+                        help='use the N most frequent words (default 1000; the number of cubes '
+                             'grows very fast with N, the top 10000 yield hundreds of millions)')
+    parser.add_argument('--max-results', type=int, help='stop after this many cubes')
+    parser.add_argument('--sample', type=int, metavar='K',
+                        help='take K random cubes from restarted randomized searches instead of '
+                             'enumerating (practical with large --top-n)')
+    parser.add_argument('--seed', type=int, help='random seed for --sample')
+    parser.add_argument('--time-budget', type=float, metavar='SECONDS',
+                        help='stop --sample after this long, with however many cubes it has')
+    parser.add_argument('--dedupe', type=float, metavar='THRESHOLD',
+                        help='collapse near-duplicate cubes at this Jaccard similarity '
+                             '(see dedupe_cubes.py; needs numpy)')
+    parser.add_argument('--dedupe-keep', type=int, default=1,
+                        help='cubes kept per near-duplicate cluster (default 1)')
+    args = parser.parse_args()
+
     base = os.path.dirname(__file__)
-    wordlists_dir = os.path.normpath(os.path.join(base, '..', 'word_lists'))
-    preferred = os.path.join(wordlists_dir, 'word_list_wordfreq.txt')
+    try:
+        wordlists_dir = locales.locale_dir(args.lang, os.path.normpath(os.path.join(base, '..', 'word_lists')))
+    except ValueError as e:
+        parser.error(str(e))
+    preferred = os.path.join(wordlists_dir, 'word_list_wordfreq.bin')
+    if not os.path.exists(preferred):
+        preferred = os.path.join(wordlists_dir, 'word_list_wordfreq.txt')
+    if not os.path.exists(preferred) and args.lang != locales.DEFAULT_LOCALE:
+        parser.error(f"no word list for '{args.lang}'; run generate_word_list.py --lang {args.lang}")
     if os.path.exists(preferred):
-        words = load_word_list(filename=preferred, top_n=10000)
+        words = load_word_list(filename=preferred, top_n=args.top_n)
         print(f"Loaded {len(words)} words from {preferred}.")
     else:
-        words = load_word_list(filename='word_list_wordfreq.txt', top_n=10000)
+        words = load_word_list(filename='word_list_wordfreq.txt', top_n=args.top_n)
         print(f"Loaded {len(words)} words from word_list_wordfreq.txt.")
 
+    exclude = []
+    if args.exclude:
+        with open(args.exclude, 'r') as f:
+            exclude = [w.strip().lower() for w in f if w.strip()]
+    frequencies = None
+    if args.min_zipf is not None:
+        if not preferred.endswith('.bin'):
+            parser.error('--min-zipf needs word_lists/word_list_wordfreq.bin; run generate_word_list.py')
+        frequencies = WordList.load(preferred).frequencies(length=4)
+
     N = 4
-    squares = find_word_cubes(words, N=N, max_results=None)
-
-    # filtering
-    total_before = len(squares)
-    valid_squares = []
-    discarded = []
-    for sq in squares:
-        rows = sq
-        cols = [''.join(sq[r][c] for r in range(N)) for c in range(N)]
-        if len(set(rows)) != N:
-            discarded.append(("duplicate_row", sq))
-            continue
-        if len(set(cols)) != N:
-            discarded.append(("duplicate_col", sq))
-            continue
-        if set(rows).intersection(set(cols)):
-            discarded.append(("row_equals_column", sq))
-            continue
-        valid_squares.append(sq)
-
-    out_file_dir = wordlists_dir
-    os.makedirs(out_file_dir, exist_ok=True)
-    out_file = os.path.join(out_file_dir, 'word_cubes.txt')
-    with open(out_file, 'w') as f:
-        for sq in valid_squares:
-            for row in sq:
-                f.write(' '.join(row) + '\n')
-            f.write('\n')
+    stats = None
+    if args.progress or args.stats:
+        stats = SearchStats(N, progress_interval=args.progress, progress_format=args.progress_format)
+    # blocklist, exclusions, frequency and distinctness rules are applied inside the search
+    constraints = dict(blocklist=BLOCKLISTS[args.blocklist], exclude=exclude,
+                       min_zipf=args.min_zipf, frequencies=frequencies)
+    if args.sample:
+        valid_squares = sample_word_cubes(words, args.sample, N=N, seed=args.seed,
+                                          time_budget=args.time_budget, stats=stats, **constraints)
+    else:
+        valid_squares = find_word_cubes(words, N=N, max_results=args.max_results, stats=stats,
+                                        **constraints)
+    if args.stats:
+        stats.write_json(args.stats)
+        print(f"Wrote search statistics to {args.stats}")
+
+    if args.dedupe is not None:
+        from dedupe_cubes import dedupe
+        found = len(valid_squares)
+        valid_squares = dedupe(valid_squares, args.dedupe, args.dedupe_keep)
+        print(f"Kept {len(valid_squares)} of {found} cubes after near-duplicate removal.")
+
+    out_file = args.out or os.path.join(wordlists_dir, 'word_cubes.txt')
+    write_cubes(valid_squares, out_file)
     print(f"Wrote {len(valid_squares)} word cubes to {out_file}")
 
 
@@ -2,24 +2,77 @@
 """Generate a frequency-based 4-letter word list into `word_lists/`.
 
 This wraps the original `get_list` helper and writes to `word_lists/word_list_wordfreq.txt`.
-If `word_lists/` does not exist it will be created.
+If `word_lists/` does not exist it will be created. The same words are also
+packed into `word_lists/lexicon.bin` (see `lexicon.py`) for guess validation.
+
+Alongside the text list, every kept word is streamed into
+`word_lists/word_list_wordfreq.bin` (see `wordlist.py`) together with its Zipf
+frequency and its rank in the overall frequency list, so consumers do not have
+to treat line order as frequency or query `wordfreq` again. `--lengths 5`
+adds 5-letter words to the binary list; 4-letter words are always kept and
+the text list and lexicon stay 4-letter only.
+
+`--lang de` builds the same files for another `wordfreq` language into
+`word_lists/de/` (see `locales.py`). Only ASCII letters-only words go into
+the binary list and the lexicon (the same rule as `lexicon._clean`), so
+contractions like "i'll" and words with non-ASCII letters never reach a
+cube or `--min-zipf`.
 """
+import argparse
 import os
-from wordfreq import top_n_list
+import sys
+from wordfreq import top_n_list, zipf_frequency
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+from lexicon import Lexicon  # noqa: E402
+from wordlist import WordListWriter  # noqa: E402
+import locales  # noqa: E402
 
 
 OUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'word_lists')
 OUT_DIR = os.path.normpath(OUT_DIR)
-os.makedirs(OUT_DIR, exist_ok=True)
-
-try:
-    all_common = top_n_list("en", n_top=50000)
-except TypeError:
-    all_common = top_n_list("en", 50000)
-
-words = [w for w in all_common if len(w) == 4]
-out_file = os.path.join(OUT_DIR, 'word_list_wordfreq.txt')
-with open(out_file, 'w') as f:
-    for w in words:
-        f.write(w + '\n')
-print(f"Wrote {len(words)} 4-letter words to {out_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lengths', type=int, nargs='+', default=[4],
+                        help='extra word lengths to keep in the binary list (4 is always kept)')
+    parser.add_argument('--top', type=int, default=50000,
+                        help='size of the wordfreq list to draw from')
+    parser.add_argument('--lang', default=locales.DEFAULT_LOCALE,
+                        help='wordfreq language code (default: the default locale)')
+    args = parser.parse_args()
+    lengths = set(args.lengths) | {4}
+    try:
+        out_dir = locales.locale_dir(args.lang, OUT_DIR)
+    except ValueError as e:
+        parser.error(str(e))
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    try:
+        all_common = top_n_list(args.lang, n_top=args.top)
+    except TypeError:
+        all_common = top_n_list(args.lang, args.top)
+
+    words = []
+    out_file = os.path.join(out_dir, 'word_list_wordfreq.txt')
+    bin_file = os.path.join(out_dir, 'word_list_wordfreq.bin')
+    with open(out_file, 'w') as f, WordListWriter(bin_file, max(lengths)) as out:
+        for rank, w in enumerate(all_common, start=1):
+            if len(w) == 4:
+                f.write(w + '\n')
+                words.append(w)
+            if len(w) in lengths and w.isascii() and w.isalpha():
+                out.add(w, zipf_frequency(w, args.lang), rank)
+    print(f"Wrote {len(words)} 4-letter words to {out_file}")
+    print(f"Wrote {out.count} words with frequencies to {bin_file}")
+
+    lexicon_file = os.path.join(out_dir, 'lexicon.bin')
+    lexicon = Lexicon.from_words(words, 4)
+    lexicon.save(lexicon_file)
+    print(f"Wrote {len(lexicon)} words to {lexicon_file}")
+
+
+if __name__ == '__main__':
+    main()
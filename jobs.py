@@ -0,0 +1,255 @@
+"""Admin-triggered cube regeneration in a background process.
+
+Enabled only when `WORDCUBE_ADMIN_TOKEN` is set. Requests must send the token
+as `Authorization: Bearer <token>` or as `?token=` (EventSource cannot set
+headers).
+
+- `POST /admin/regenerate` starts `generators/generate_cubes.py` in a child
+  process with its niceness raised by `WORDCUBE_JOB_NICE` (default 10), so
+  serving keeps priority. `top_n`, `max_results`, `blocklist`, `dedupe` and
+  `lang` are passed through to the generator; `lang` also picks the corpus
+  the result replaces. Returns the job id, or 409 while a job is already
+  running.
+- `GET /admin/jobs/<id>/events` streams the job's progress as Server-Sent
+  Events (`started`, `progress`, `log`, then `done` or `failed`).
+
+The generator writes `<cubes file>.new`. Once it exits cleanly and the file
+holds at least one cube, that file is renamed over the live cube file with
+`os.replace`, so readers see either the old corpus or the new one. Running
+workers notice the new mtime and drop their caches, see
+`app.reload_cubes_if_changed`.
+
+Job state lives on disk in `WORDCUBE_JOB_DIR` (default `jobs/`), as one
+`<id>.jsonl` event log per job plus a lock file. Any gunicorn worker can
+therefore stream any job, and only one job runs at a time across workers.
+Each event stream ends after `STREAM_SECONDS`, so a sync worker is not held
+past gunicorn's timeout. EventSource reconnects with `Last-Event-ID` and the
+stream resumes where it stopped.
+"""
+import fcntl
+import hmac
+import json
+import os
+import re
+import secrets
+import subprocess
+import sys
+import threading
+import time
+
+from flask import Response, jsonify, request, url_for
+
+import locales
+
+ADMIN_TOKEN = os.environ.get('WORDCUBE_ADMIN_TOKEN', '')
+JOB_DIR = os.environ.get('WORDCUBE_JOB_DIR', 'jobs')
+NICE = int(os.environ.get('WORDCUBE_JOB_NICE', '10'))
+ROOT = os.path.dirname(os.path.abspath(__file__))
+GENERATOR = os.path.join(ROOT, 'generators', 'generate_cubes.py')
+BLOCKLISTS = ('random', 'daily', 'none')
+POLL_SECONDS = 0.5
+STREAM_SECONDS = 25
+PROGRESS_SECONDS = 1
+
+_JOB_ID = re.compile(r'\d{8}-\d{6}-[0-9a-f]{6}')
+_TERMINAL = ('done', 'failed')
+
+
+def _log_path(job_id):
+    return os.path.join(JOB_DIR, f'{job_id}.jsonl')
+
+
+def _lock_path():
+    return os.path.join(JOB_DIR, 'regenerate.lock')
+
+
+def _try_lock():
+    """Open file holding the job lock, or None if another job holds it."""
+    os.makedirs(JOB_DIR, exist_ok=True)
+    f = open(_lock_path(), 'a')
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        return None
+    return f
+
+
+def is_running():
+    lock = _try_lock()
+    if lock is None:
+        return True
+    lock.close()
+    return False
+
+
+def generator_args(values):
+    """Command-line arguments for the generator from request values."""
+    args = []
+    for name, flag, conv in (('top_n', '--top-n', int), ('max_results', '--max-results', int),
+                             ('dedupe', '--dedupe', float)):
+        raw = values.get(name)
+        if raw:
+            args += [flag, str(conv(raw))]
+    lang = values.get('lang')
+    if lang:
+        if not locales.is_locale_code(lang):
+            raise ValueError(f"not a locale code: {lang!r}")
+        args += ['--lang', lang]
+    blocklist = values.get('blocklist')
+    if blocklist:
+        if blocklist not in BLOCKLISTS:
+            raise ValueError(f"blocklist must be one of {', '.join(BLOCKLISTS)}")
+        args += ['--blocklist', blocklist]
+    return args
+
+
+def _lower_priority():
+    # runs in the child between fork and exec, so the generator never runs at full priority
+    try:
+        os.nice(NICE)
+    except OSError:
+        pass
+
+
+class RegenerateJob(threading.Thread):
+    """Runs the generator, logs its progress and publishes the result."""
+
+    def __init__(self, job_id, args, cubes_file, load_cubes, lock):
+        super().__init__(daemon=True, name=f'regenerate-{job_id}')
+        self.job_id = job_id
+        self.args = args
+        self.cubes_file = os.path.abspath(cubes_file)
+        self.load_cubes = load_cubes
+        self._lock = lock
+        self._log = open(_log_path(job_id), 'a')
+
+    def _event(self, event, **fields):
+        self._log.write(json.dumps({'event': event, 'time': time.time(), **fields}) + '\n')
+        self._log.flush()
+
+    def run(self):
+        try:
+            self._run()
+        except Exception as e:
+            self._event('failed', error=str(e))
+        finally:
+            self._log.close()
+            self._lock.close()
+
+    def _run(self):
+        staging = self.cubes_file + '.new'
+        cmd = [sys.executable, GENERATOR, '--progress', str(PROGRESS_SECONDS),
+               '--progress-format', 'json', '--out', staging] + self.args
+        self._event('started', args=self.args)
+        proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                stdin=subprocess.DEVNULL, text=True, preexec_fn=_lower_priority)
+        for line in proc.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                progress = json.loads(line)
+            except ValueError:
+                progress = None
+            if isinstance(progress, dict) and progress.get('event') == 'progress':
+                self._event('progress', **{k: v for k, v in progress.items() if k != 'event'})
+            else:
+                self._event('log', message=line)
+        code = proc.wait()
+        if code != 0:
+            self._event('failed', error=f'generator exited with status {code}')
+            return
+        cubes = self.load_cubes(staging)
+        if not cubes:
+            os.remove(staging)
+            self._event('failed', error='no cubes generated; keeping the current corpus')
+            return
+        os.replace(staging, self.cubes_file)
+        self._event('done', cubes=len(cubes))
+
+
+def start(args, cubes_file, load_cubes):
+    """Start a regeneration job; returns its id, or None if one is running."""
+    lock = _try_lock()
+    if lock is None:
+        return None
+    job_id = time.strftime('%Y%m%d-%H%M%S') + '-' + secrets.token_hex(3)
+    RegenerateJob(job_id, args, cubes_file, load_cubes, lock).start()
+    return job_id
+
+
+def stream_events(job_id, last_id=0):
+    """SSE frames for a job's events after `last_id`; ends at the job's end or after STREAM_SECONDS."""
+    deadline = time.monotonic() + STREAM_SECONDS
+    yield f'retry: {int(POLL_SECONDS * 2000)}\n\n'
+    with open(_log_path(job_id), 'r') as f:
+        n = 0
+        while True:
+            pos = f.tell()
+            line = f.readline()
+            if line.endswith('\n'):
+                n += 1
+                if n <= last_id:
+                    continue
+                event = json.loads(line)['event']
+                yield f'id: {n}\nevent: {event}\ndata: {line}\n'
+                if event in _TERMINAL:
+                    return
+                continue
+            # partial or no line yet: wait for the writer
+            f.seek(pos)
+            if time.monotonic() >= deadline:
+                return
+            if not is_running():
+                # one last read in case the job finished between the two checks
+                if f.readline().endswith('\n'):
+                    f.seek(pos)
+                    continue
+                data = json.dumps({'event': 'failed', 'error': 'job is no longer running'})
+                yield f'id: {n + 1}\nevent: failed\ndata: {data}\n\n'
+                return
+            time.sleep(POLL_SECONDS)
+
+
+def _authorized():
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    supplied = supplied or request.args.get('token', '')
+    return hmac.compare_digest(supplied.encode(), ADMIN_TOKEN.encode())
+
+
+def init_app(app, cubes_file_for, load_cubes):
+    """Register the admin routes when `WORDCUBE_ADMIN_TOKEN` is set.
+
+    `cubes_file_for(lang)` is the live cube file of a locale (None for the
+    default). `load_cubes(path)` parses a cube file; a job only publishes a
+    result it can load at least one cube from.
+    """
+    if not ADMIN_TOKEN:
+        return
+
+    @app.route('/admin/regenerate', methods=['POST'])
+    def admin_regenerate():
+        if not _authorized():
+            return jsonify({'error': 'unauthorized'}), 401
+        try:
+            args = generator_args(request.values)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        job_id = start(args, cubes_file_for(request.values.get('lang')), load_cubes)
+        if job_id is None:
+            return jsonify({'error': 'a regeneration job is already running'}), 409
+        return jsonify({'job': job_id, 'events': url_for('admin_job_events', job_id=job_id)}), 202
+
+    @app.route('/admin/jobs/<job_id>/events')
+    def admin_job_events(job_id):
+        if not _authorized():
+            return jsonify({'error': 'unauthorized'}), 401
+        if not _JOB_ID.fullmatch(job_id) or not os.path.exists(_log_path(job_id)):
+            return jsonify({'error': 'no such job'}), 404
+        try:
+            last_id = int(request.headers.get('Last-Event-ID', '0'))
+        except ValueError:
+            last_id = 0
+        return Response(stream_events(job_id, last_id), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
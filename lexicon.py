@@ -0,0 +1,166 @@
+"""Compact sorted word lexicon with membership and prefix-range queries.
+
+Words of one fixed length are stored back to back, sorted, as ASCII bytes.
+Membership and prefix queries are binary searches over that buffer, so no
+per-word Python objects are kept alive and a lexicon file can be mmapped and
+shared between worker processes through the page cache.
+
+File layout (little endian)::
+
+    b'WCLX'  u16 version  u16 word_len  u32 count  count * word_len bytes
+
+Build a file from a text word list with::
+
+    python3 lexicon.py word_lists/word_list_wordfreq.txt word_lists/lexicon.bin
+"""
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b'WCLX'
+VERSION = 1
+HEADER = struct.Struct('<4sHHI')
+
+
+def _clean(words, word_len):
+    out = set()
+    for w in words:
+        w = w.strip().lower()
+        if len(w) == word_len and w.isascii() and w.isalpha():
+            out.add(w)
+    return sorted(out)
+
+
+class Lexicon:
+    def __init__(self, buf, word_len, count, offset=0):
+        self._buf = buf
+        self.word_len = word_len
+        self._count = count
+        self._offset = offset
+
+    @classmethod
+    def from_words(cls, words, word_len=4):
+        """In-memory lexicon of the `word_len`-letter alphabetic words in `words`."""
+        clean = _clean(words, word_len)
+        return cls(''.join(clean).encode('ascii'), word_len, len(clean))
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a lexicon file written by `save`."""
+        with open(path, 'rb') as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, word_len, count = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} lexicon file")
+        if len(buf) != HEADER.size + word_len * count:
+            raise ValueError(f"{path} is truncated")
+        return cls(buf, word_len, count, HEADER.size)
+
+    def save(self, path):
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.word_len, self._count))
+            start = self._offset
+            f.write(self._buf[start:start + self.word_len * self._count])
+        os.replace(tmp, path)
+
+    def __len__(self):
+        return self._count
+
+    def _key(self, i, n):
+        start = self._offset + i * self.word_len
+        return self._buf[start:start + n]
+
+    def word(self, i):
+        return self._key(i, self.word_len).decode('ascii')
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self.word(i)
+
+    def _bound(self, key, lo, hi, upper):
+        n = len(key)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe = self._key(mid, n)
+            if probe < key or (upper and probe == key):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def prefix_range(self, prefix, lo=0, hi=None):
+        """Index range [start, end) of words starting with `prefix`.
+
+        Passing the range of a shorter prefix as `lo`/`hi` restricts the search
+        to it.
+        """
+        if hi is None:
+            hi = self._count
+        if not prefix:
+            return lo, hi
+        try:
+            key = prefix.encode('ascii')
+        except UnicodeEncodeError:
+            return lo, lo
+        start = self._bound(key, lo, hi, upper=False)
+        return start, self._bound(key, start, hi, upper=True)
+
+    def children(self, lo, hi, depth):
+        """Map each next letter to its sub-range, for a `prefix_range` result.
+
+        One entry per distinct letter at `depth` in [lo, hi); this is a trie
+        node computed on demand from the packed array.
+        """
+        buf = self._buf
+        base = self._offset + depth
+        width = self.word_len
+        out = {}
+        start = lo
+        while start < hi:
+            target = buf[base + start * width]
+            a, b = start + 1, hi
+            while a < b:
+                mid = (a + b) // 2
+                if buf[base + mid * width] <= target:
+                    a = mid + 1
+                else:
+                    b = mid
+            out[chr(target)] = (start, a)
+            start = a
+        return out
+
+    def has_prefix(self, prefix):
+        start, end = self.prefix_range(prefix)
+        return end > start
+
+    def count_prefix(self, prefix):
+        start, end = self.prefix_range(prefix)
+        return end - start
+
+    def words_with_prefix(self, prefix):
+        start, end = self.prefix_range(prefix)
+        for i in range(start, end):
+            yield self.word(i)
+
+    def __contains__(self, word):
+        if len(word) != self.word_len:
+            return False
+        start, end = self.prefix_range(word)
+        return end > start
+
+
+def build(src, dest, word_len=4):
+    with open(src, 'r') as f:
+        lex = Lexicon.from_words(f, word_len)
+    lex.save(dest)
+    return lex
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print(f"usage: {sys.argv[0]} WORD_LIST.txt LEXICON.bin")
+        sys.exit(1)
+    lex = build(sys.argv[1], sys.argv[2])
+    print(f"Wrote {len(lex)} words to {sys.argv[2]}")
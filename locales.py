@@ -0,0 +1,49 @@
+"""Where each locale's word lists and cube corpus live.
+
+The default locale (`WORDCUBE_DEFAULT_LOCALE`, default `en`) uses the files
+directly in `word_lists/`. Any other locale `xx` uses the same file names in
+`word_lists/xx/`. A locale can be played once its directory holds a
+`word_cubes.txt`; build one with::
+
+    python3 generators/generate_word_list.py --lang de
+    python3 generators/generate_cubes.py --lang de
+
+Words are limited to ASCII letters (the lexicon, cube search and event log
+all assume a-z), so words with accented letters are dropped.
+"""
+import os
+import re
+
+DEFAULT_LOCALE = os.environ.get('WORDCUBE_DEFAULT_LOCALE', 'en')
+WORD_LISTS_DIR = 'word_lists'
+
+_LOCALE = re.compile(r'[a-z]{2,3}')
+
+
+def is_locale_code(lang):
+    return bool(lang) and _LOCALE.fullmatch(lang) is not None
+
+
+def locale_dir(lang, base=WORD_LISTS_DIR):
+    """Directory holding `lang`'s files, under `base` (default: `word_lists`)."""
+    if not lang or lang == DEFAULT_LOCALE:
+        return base
+    if not is_locale_code(lang):
+        raise ValueError(f"not a locale code: {lang!r}")
+    return os.path.join(base, lang)
+
+
+def is_available(lang, base=WORD_LISTS_DIR):
+    """True when `lang` has a cube corpus to play."""
+    if lang == DEFAULT_LOCALE:
+        return True
+    return is_locale_code(lang) and os.path.exists(os.path.join(locale_dir(lang, base), 'word_cubes.txt'))
+
+
+def available_locales(base=WORD_LISTS_DIR):
+    """The default locale followed by every other locale with a cube corpus, sorted."""
+    others = []
+    if os.path.isdir(base):
+        others = sorted(name for name in os.listdir(base)
+                        if name != DEFAULT_LOCALE and is_available(name, base))
+    return [DEFAULT_LOCALE] + others
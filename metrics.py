@@ -0,0 +1,210 @@
+"""In-process request metrics exposed in the Prometheus text format.
+
+Disabled unless `WORDCUBE_METRICS=1`. When disabled every helper below returns
+immediately (or hands back a shared no-op context manager), so instrumented
+call sites in `app.py` cost a single attribute check.
+
+`WORDCUBE_SERVER_TIMING=1` additionally attaches a `Server-Timing` header to
+each response listing the timed sections of that request.
+
+Metrics are per process: with several gunicorn workers each worker exposes its
+own counters and `/metrics` reports whichever worker served the scrape.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import g, request
+from flask.sessions import SecureCookieSessionInterface
+
+ENABLED = os.environ.get('WORDCUBE_METRICS', '') == '1'
+SERVER_TIMING = os.environ.get('WORDCUBE_SERVER_TIMING', '') == '1'
+
+# seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# bytes; browsers reject cookies over 4096
+COOKIE_BUCKETS = (256, 512, 1024, 1536, 2048, 3072, 4096)
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+
+_HELP = {
+    'wordcube_requests_total': ('counter', 'Requests served, by route and status.'),
+    'wordcube_request_seconds': ('histogram', 'Request latency, by route.'),
+    'wordcube_section_seconds': ('histogram', 'Time spent in instrumented sections.'),
+    'wordcube_session_cookie_bytes': ('histogram', 'Size of the Set-Cookie session header.'),
+    'wordcube_cache_requests_total': ('counter', 'Cache lookups, by cache and result.'),
+    'wordcube_games_started_total': ('counter', 'Games started, by mode.'),
+    'wordcube_games_solved_total': ('counter', 'Games solved, by mode.'),
+}
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+
+def inc(name, amount=1, **labels):
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def observe(name, value, buckets=LATENCY_BUCKETS, **labels):
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [buckets, [0] * (len(buckets) + 1), 0.0]
+        hist[1][bisect_left(buckets, value)] += 1
+        hist[2] += value
+
+
+def cache_lookup(cache, hit):
+    inc('wordcube_cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+@contextmanager
+def _timer(section):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        observe('wordcube_section_seconds', elapsed, section=section)
+        if SERVER_TIMING:
+            try:
+                g.setdefault('server_timing', []).append((section, elapsed))
+            except RuntimeError:
+                # outside an app context (CLI, tests)
+                pass
+
+
+def timed(section):
+    """Context manager timing `section`; a shared no-op when metrics are off."""
+    if not ENABLED:
+        return _NULL_TIMER
+    return _timer(section)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in items) + '}'
+
+
+def render():
+    """Return all metrics in the Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {k: (v[0], list(v[1]), v[2]) for k, v in _histograms.items()}
+
+    lines = []
+    seen = set()
+
+    def header(name):
+        if name in seen:
+            return
+        seen.add(name)
+        kind, text = _HELP.get(name, ('untyped', ''))
+        lines.append(f'# HELP {name} {text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    for (name, labels), value in sorted(counters.items()):
+        header(name)
+        lines.append(f'{name}{_format_labels(labels)} {value}')
+
+    for (name, labels), (buckets, counts, total) in sorted(histograms.items()):
+        header(name)
+        cumulative = 0
+        for bound, count in zip(buckets, counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {cumulative}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+        lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+class TimedSessionInterface(SecureCookieSessionInterface):
+    """Cookie sessions that record the Set-Cookie size and time spent saving.
+
+    The session cookie is written after the after_request hooks have run, so
+    it is measured here rather than in `_record_request`.
+    """
+
+    def save_session(self, app, session, response):
+        start = time.perf_counter()
+        try:
+            return super().save_session(app, session, response)
+        finally:
+            elapsed = time.perf_counter() - start
+            observe('wordcube_section_seconds', elapsed, section='session_save')
+            cookie_name = self.get_cookie_name(app)
+            for value in response.headers.getlist('Set-Cookie'):
+                if value.startswith(cookie_name + '='):
+                    observe('wordcube_session_cookie_bytes', len(value), buckets=COOKIE_BUCKETS)
+            if SERVER_TIMING and 'Server-Timing' in response.headers:
+                response.headers['Server-Timing'] += f', session_save;dur={elapsed * 1000:.2f}'
+
+
+def init_app(app):
+    """Register request hooks and the `/metrics` endpoint on `app`."""
+    if not ENABLED:
+        return
+
+    @app.before_request
+    def _start_request_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop('request_start', None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        route = request.endpoint or 'unknown'
+        inc('wordcube_requests_total', route=route, status=response.status_code)
+        observe('wordcube_request_seconds', elapsed, route=route)
+
+        if SERVER_TIMING:
+            parts = [f'{name};dur={secs * 1000:.2f}' for name, secs in g.pop('server_timing', [])]
+            parts.append(f'total;dur={elapsed * 1000:.2f}')
+            response.headers['Server-Timing'] = ', '.join(parts)
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        return render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+    app.session_interface = TimedSessionInterface()
@@ -0,0 +1,151 @@
+"""Opt-in sampling profiler for live requests.
+
+Set `WORDCUBE_PROFILE_RATE` to the fraction of requests to profile (e.g.
+`0.01`). Each sampled request is run under cProfile and tracemalloc while a
+background thread samples its stack; results go to `WORDCUBE_PROFILE_DIR`
+(default `profiles/`):
+
+- `<route>/<time>-<pid>-<n>.prof` — cProfile dump (`python -m pstats`, snakeviz);
+  `n` counts the worker's sampled requests, so dumps in the same second don't clash.
+- `<route>/<time>-<pid>-<n>.alloc.txt` — peak traced memory and top allocation sites.
+- `<route>.<pid>.folded` — stacks aggregated over every request of the route
+  sampled by that worker, one `frame;frame;frame count` line per stack (feed to
+  flamegraph.pl or speedscope; concatenate the per-worker files first).
+
+`WORDCUBE_PROFILE_INTERVAL` sets the stack sampling interval in milliseconds
+(default 5). Unsampled requests pay one `random()` call; with the rate unset no
+hooks are registered at all. Only one request per process is profiled at a
+time since cProfile and tracemalloc are process-wide.
+"""
+import cProfile
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from flask import g, request
+
+RATE = float(os.environ.get('WORDCUBE_PROFILE_RATE', '0') or 0)
+PROFILE_DIR = os.environ.get('WORDCUBE_PROFILE_DIR', 'profiles')
+INTERVAL = float(os.environ.get('WORDCUBE_PROFILE_INTERVAL', '5')) / 1000.0
+TOP_ALLOCATIONS = 25
+
+_active = threading.Lock()
+_folded_lock = threading.Lock()
+_folded = {}
+_dump_numbers = itertools.count()
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f'{module}:{code.co_name}'
+
+
+def _fold(frame):
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return ';'.join(stack)
+
+
+class _StackSampler(threading.Thread):
+    """Periodically records the stack of one thread until stopped."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True, name='wordcube-profiler')
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[_fold(frame)] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class _RequestProfile:
+    def __init__(self, route):
+        self.route = route
+        self.profiler = cProfile.Profile()
+        self.sampler = _StackSampler(threading.get_ident(), INTERVAL)
+        self.started_tracemalloc = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracemalloc = True
+        tracemalloc.reset_peak()
+        self.sampler.start()
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        self.sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        _current, peak = tracemalloc.get_traced_memory()
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+        self._write(snapshot, peak)
+
+    def _write(self, snapshot, peak):
+        route_dir = os.path.join(PROFILE_DIR, self.route)
+        os.makedirs(route_dir, exist_ok=True)
+        name = f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{next(_dump_numbers)}'
+        stem = os.path.join(route_dir, name)
+
+        self.profiler.dump_stats(stem + '.prof')
+
+        with open(stem + '.alloc.txt', 'w') as f:
+            f.write(f'{request.method} {request.full_path}\n')
+            f.write(f'peak traced memory: {peak} bytes\n\n')
+            for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+                f.write(f'{stat}\n')
+
+        with _folded_lock:
+            totals = _folded.setdefault(self.route, Counter())
+            totals.update(self.sampler.stacks)
+            lines = [f'{stack} {count}\n' for stack, count in totals.items()]
+        folded_path = os.path.join(PROFILE_DIR, f'{self.route}.{os.getpid()}.folded')
+        tmp_path = folded_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.writelines(lines)
+        os.replace(tmp_path, folded_path)
+
+
+def init_app(app):
+    """Register the sampling hooks on `app` when profiling is enabled."""
+    if RATE <= 0:
+        return
+
+    @app.before_request
+    def _maybe_start_profile():
+        if random.random() >= RATE:
+            return
+        if not _active.acquire(blocking=False):
+            return
+        profile = _RequestProfile(request.endpoint or 'unknown')
+        g.request_profile = profile
+        profile.start()
+
+    @app.teardown_request
+    def _finish_profile(exc):
+        profile = g.pop('request_profile', None)
+        if profile is None:
+            return
+        try:
+            profile.stop()
+        finally:
+            _active.release()
@@ -0,0 +1,171 @@
+"""Finished-game results in SQLite, written off the request path.
+
+`record()` only appends to an in-process queue, so `/guess` never waits on
+disk. A `background.BackgroundWriter` thread drains the queue and writes
+whatever has piled up as one batch per transaction. Results for a game in
+progress are never written; a game counts once it is solved or given up.
+Games where `/hint` handed over a letter are stored with `hinted` set and
+left out of the stats.
+
+`daily_stats()` serves the day's solve rate and attempts/time histograms
+from an in-memory snapshot that is rebuilt with one aggregate query at most
+every `WORDCUBE_STATS_REFRESH` seconds (default 5). Concurrent readers get
+the previous snapshot while one thread refreshes it.
+
+The database path comes from `WORDCUBE_RESULTS_DB` (default `results.db`).
+Each gunicorn worker runs its own writer; SQLite's WAL mode lets them write
+to the same file.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from background import BackgroundWriter
+
+DB_PATH = os.environ.get('WORDCUBE_RESULTS_DB', 'results.db')
+REFRESH_SECONDS = float(os.environ.get('WORDCUBE_STATS_REFRESH', '5'))
+BATCH_SIZE = 200
+# results are dropped rather than blocking a request when the writer falls behind
+QUEUE_SIZE = 10000
+
+# game modes stats can be filtered by (session['game_mode'] in app.py)
+MODES = ('daily', 'custom')
+# most (day, mode) snapshots kept; the least recently used is dropped first
+SNAPSHOT_LIMIT = 16
+
+MAX_ATTEMPTS_BUCKET = 6
+# completion time buckets, seconds
+TIME_BUCKETS = (30, 60, 120, 300, 600, 1800)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    day TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    difficulty TEXT,
+    solved INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    seconds REAL,
+    finished_at REAL NOT NULL,
+    hinted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS results_day ON results (day);
+"""
+COLUMNS = ('day', 'mode', 'difficulty', 'solved', 'attempts', 'seconds', 'finished_at', 'hinted')
+
+_snapshots = OrderedDict()
+_snapshot_lock = threading.Lock()
+
+
+def connect(path=None):
+    conn = sqlite3.connect(path or DB_PATH, timeout=10)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(SCHEMA)
+    # databases created before hint tracking lack the column
+    if 'hinted' not in {row[1] for row in conn.execute('PRAGMA table_info(results)')}:
+        with conn:
+            conn.execute('ALTER TABLE results ADD COLUMN hinted INTEGER NOT NULL DEFAULT 0')
+    return conn
+
+
+def _insert(conn, batch):
+    with conn:
+        conn.executemany(f"INSERT INTO results ({', '.join(COLUMNS)}) "
+                         f"VALUES ({', '.join('?' * len(COLUMNS))})", batch)
+
+
+def new_writer():
+    """Writer thread for queued results; it opens DB_PATH when it starts."""
+    return BackgroundWriter('results-writer', connect, _insert, QUEUE_SIZE, BATCH_SIZE,
+                            errors=(sqlite3.Error,))
+
+
+_writer = new_writer()
+
+
+def record(day, mode, difficulty, solved, attempts, seconds, hinted=False):
+    """Queue one finished game; never blocks."""
+    _writer.put((day, mode, difficulty, int(bool(solved)), attempts, seconds, time.time(),
+                 int(bool(hinted))))
+
+
+def flush():
+    """Block until everything queued so far is written (for tests and shutdown)."""
+    _writer.flush()
+
+
+# time bucket index computed in SQL, so the aggregate groups a handful of rows
+_TIME_BUCKET_SQL = 'CASE WHEN seconds IS NULL THEN -1 {} ELSE {} END'.format(
+    ' '.join(f'WHEN seconds <= {b} THEN {i}' for i, b in enumerate(TIME_BUCKETS)),
+    len(TIME_BUCKETS))
+TIME_LABELS = [f'<={b}s' for b in TIME_BUCKETS] + [f'>{TIME_BUCKETS[-1]}s']
+
+
+def _aggregate(conn, day, mode=None):
+    overflow = f'{MAX_ATTEMPTS_BUCKET + 1}+'
+    attempts_hist = {str(n): 0 for n in range(1, MAX_ATTEMPTS_BUCKET + 1)}
+    attempts_hist[overflow] = 0
+    times_hist = dict.fromkeys(TIME_LABELS, 0)
+    games = solved_games = 0
+    where, params = 'day = ? AND NOT hinted', [MAX_ATTEMPTS_BUCKET + 1, day]
+    if mode is not None:
+        where += ' AND mode = ?'
+        params.append(mode)
+    rows = conn.execute(
+        f'SELECT solved, MIN(attempts, ?), {_TIME_BUCKET_SQL}, COUNT(*) FROM results '
+        f'WHERE {where} GROUP BY 1, 2, 3', params)
+    for solved, attempts, bucket, n in rows:
+        games += n
+        if not solved:
+            continue
+        solved_games += n
+        if attempts > MAX_ATTEMPTS_BUCKET:
+            attempts_hist[overflow] += n
+        elif attempts >= 1:
+            attempts_hist[str(attempts)] += n
+        if bucket >= 0:
+            times_hist[TIME_LABELS[bucket]] += n
+    return {
+        'day': day,
+        'mode': mode,
+        'games': games,
+        'solved': solved_games,
+        'solve_rate': solved_games / games if games else 0.0,
+        'attempts': attempts_hist,
+        'times': times_hist,
+    }
+
+
+def daily_stats(day, mode=None):
+    """Cached aggregate for `day` (and `mode`, or all modes); at most one query per refresh interval."""
+    key = (day, mode)
+    now = time.monotonic()
+    cached = _snapshots.get(key)
+    if cached is not None:
+        try:
+            _snapshots.move_to_end(key)
+        except KeyError:
+            # evicted by a concurrent refresh; it is put back below
+            pass
+        if now - cached[0] < REFRESH_SECONDS:
+            return cached[1]
+    # one thread refreshes; the others keep serving the old snapshot
+    if not _snapshot_lock.acquire(blocking=cached is None):
+        return cached[1]
+    try:
+        cached = _snapshots.get(key)
+        if cached is not None and now - cached[0] < REFRESH_SECONDS:
+            return cached[1]
+        conn = connect()
+        try:
+            stats = _aggregate(conn, day, mode)
+        finally:
+            conn.close()
+        _snapshots[key] = (time.monotonic(), stats)
+        _snapshots.move_to_end(key)
+        while len(_snapshots) > SNAPSHOT_LIMIT:
+            _snapshots.popitem(last=False)
+        return stats
+    finally:
+        _snapshot_lock.release()
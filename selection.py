@@ -0,0 +1,73 @@
+"""No-repeat random selection from the cube corpus.
+
+Each player walks a seeded pseudo-random permutation of the corpus, so no cube
+comes back until every other one has been played. Only `[seed, cursor, size]`
+is kept in the session, a few bytes whatever the corpus size. The permutation
+is never materialised: `Permutation[i]` is a small Feistel network over the
+next power-of-four domain, and out-of-range outputs are walked forward
+(cycle-walking), so one lookup is O(1) with fewer than four walks on average.
+
+When the cursor reaches the end a new seed starts a fresh cycle. If the corpus
+size changes (cubes regenerated), the old order means nothing any more and a
+new cycle starts as well.
+"""
+import random
+
+ROUNDS = 4
+_MASK32 = 0xFFFFFFFF
+
+
+def _mix(x):
+    # murmur3 finalizer: cheap and well spread for a round function
+    x &= _MASK32
+    x ^= x >> 16
+    x = (x * 0x85EBCA6B) & _MASK32
+    x ^= x >> 13
+    x = (x * 0xC2B2AE35) & _MASK32
+    x ^= x >> 16
+    return x
+
+
+class Permutation:
+    """A seeded bijection on range(n)."""
+
+    def __init__(self, n, seed):
+        if n < 1:
+            raise ValueError("cannot permute an empty range")
+        self.n = n
+        self.half = max(1, ((n - 1).bit_length() + 1) // 2)
+        self._half_mask = (1 << self.half) - 1
+        self._keys = [_mix(seed * ROUNDS + r + 1) for r in range(ROUNDS)]
+
+    def _encrypt(self, x):
+        left, right = x >> self.half, x & self._half_mask
+        for key in self._keys:
+            left, right = right, left ^ (_mix(right ^ key) & self._half_mask)
+        return (left << self.half) | right
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        x = self._encrypt(i)
+        while x >= self.n:
+            x = self._encrypt(x)
+        return x
+
+    def __len__(self):
+        return self.n
+
+
+def draw(state, n, rng=random):
+    """Next index in range(n) for a player's selection `state`.
+
+    `state` is the value previously returned (or None for a new player).
+    Returns `(index, new_state)`; store `new_state` back in the session.
+    """
+    if not state or len(state) != 3 or state[2] != n or not 0 <= state[1] < n:
+        state = [rng.getrandbits(32), 0, n]
+    seed, cursor, _ = state
+    index = Permutation(n, seed)[cursor]
+    cursor += 1
+    if cursor == n:
+        return index, [rng.getrandbits(32), 0, n]
+    return index, [seed, cursor, n]
@@ -0,0 +1,268 @@
+"""Headless self-play against the real feedback rules.
+
+Scripted strategies play whole games through `app.compute_feedback_all_rows`
+with no UI or session involved, which makes this both a throughput benchmark
+for the feedback engine and a way to tune reveal counts per difficulty.
+Games are spread over a process pool; each worker loads the corpus once.
+
+Run it through the CLI::
+
+    python3 wordcube_game.py --simulate 20000 --strategy frequency --workers 4
+
+A strategy is a class with `new_game(known, rng)` (known maps (row, col) to
+revealed letters) and `next_guess(attempts, feedbacks)` returning four rows;
+register new ones in `STRATEGIES`.
+"""
+import json
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from app import (MAX_ATTEMPTS, REVEAL_COUNTS, choose_revealed, compute_feedback_all_rows,
+                 get_cubes, get_solver_index)
+from cube_index import iter_ids, nth_id
+from wordlist import WordList
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+WORD_LIST_BIN = os.path.join('word_lists', 'word_list_wordfreq.bin')
+
+
+class WordIndex:
+    """Bitmaps over a frequency-ordered word list (bit 0 = most frequent word)."""
+
+    def __init__(self, words):
+        self.words = words
+        self.all = (1 << len(words)) - 1
+        self.pos = [dict.fromkeys(ALPHABET, 0) for _ in range(4)]
+        for i, w in enumerate(words):
+            for p, ch in enumerate(w):
+                self.pos[p][ch] |= 1 << i
+
+    @classmethod
+    def from_file(cls, path=WORD_LIST_BIN):
+        """Four-letter words from the binary word list, most frequent first."""
+        words = WordList.load(path).words(length=4)
+        return cls([w.lower() for w in words if w.isascii() and w.isalpha()])
+
+    def matching(self, fixed, forbidden):
+        """Words with letter `fixed[p]` where set, avoiding `forbidden[p]` elsewhere."""
+        mask = self.all
+        for p in range(4):
+            if fixed[p]:
+                mask &= self.pos[p].get(fixed[p], 0)
+            else:
+                for ch in forbidden[p]:
+                    mask &= ~self.pos[p][ch]
+        return mask
+
+
+class _RowStrategy:
+    """Solve each row on its own, Wordle-style, from greens and absent letters.
+
+    Subclasses choose among the words that still fit a row by overriding
+    `_pick`; the default plays the most frequent one.
+    """
+
+    word_index = None
+
+    def new_game(self, known, rng):
+        self.rng = rng
+        self.fixed = [[known.get((r, c)) for c in range(4)] for r in range(4)]
+        self.forbidden = [[set() for _ in range(4)] for _ in range(4)]
+        self.tried = [0] * 4
+
+    def _learn(self, attempt, fb_rows):
+        absent = set()
+        for r in range(4):
+            for c in range(4):
+                ch, fb = attempt[r][c], fb_rows[r][c]
+                if ch == ' ' or self.fixed[r][c]:
+                    continue
+                if fb == 'G':
+                    self.fixed[r][c] = ch
+                else:
+                    self.forbidden[r][c].add(ch)
+                    if fb == '_':
+                        absent.add(ch)
+        # '_' means no unsolved cell holds the letter, and unsolved cells only shrink
+        for r in range(4):
+            for c in range(4):
+                self.forbidden[r][c] |= absent
+
+    def _pick(self, mask):
+        return (mask & -mask).bit_length() - 1
+
+    def next_guess(self, attempts, feedbacks):
+        if attempts:
+            self._learn(attempts[-1], feedbacks[-1])
+        index = self.word_index
+        guesses = []
+        for r in range(4):
+            mask = index.matching(self.fixed[r], self.forbidden[r]) & ~self.tried[r]
+            if mask:
+                i = self._pick(mask)
+                self.tried[r] |= 1 << i
+                guesses.append(index.words[i])
+            else:
+                # nothing in the list fits; play the known letters only
+                guesses.append(''.join(ch or ' ' for ch in self.fixed[r]))
+        return guesses
+
+
+class FrequencyStrategy(_RowStrategy):
+    """Play the most frequent word consistent with what each row has shown."""
+
+
+class RandomStrategy(_RowStrategy):
+    """Play a uniformly random word consistent with what each row has shown."""
+
+    def _pick(self, mask):
+        return nth_id(mask, self.rng.randrange(mask.bit_count()))
+
+
+class CorpusStrategy:
+    """Knows the cube corpus: always plays a cube still consistent with the feedback.
+
+    Measures how ambiguous a reveal leaves the corpus rather than how hard the
+    puzzle is for a person.
+    """
+
+    def new_game(self, known, rng):
+        self.rng = rng
+        self.known = known
+
+    def next_guess(self, attempts, feedbacks):
+        index = get_solver_index()
+        mask = index.narrow(self.known, attempts, feedbacks)
+        # never replay a cube that was already guessed
+        ids = [i for i in iter_ids(mask) if index.cubes[i] not in attempts]
+        if not ids:
+            return [''.join(self.known.get((r, c), ' ') for c in range(4)) for r in range(4)]
+        return list(index.cubes[self.rng.choice(ids)])
+
+
+STRATEGIES = {
+    'frequency': FrequencyStrategy,
+    'random': RandomStrategy,
+    'corpus': CorpusStrategy,
+}
+
+
+def play_game(cube, revealed, strategy, rng, max_attempts=MAX_ATTEMPTS):
+    """Play one game; returns the number of attempts used, or None if unsolved."""
+    known = {(r, c): cube[r][c] for (r, c) in revealed}
+    strategy.new_game(known, rng)
+    attempts = []
+    feedbacks = []
+    for n in range(1, max_attempts + 1):
+        guesses = strategy.next_guess(attempts, feedbacks)
+        fbs = compute_feedback_all_rows(guesses, cube, revealed, attempts, feedbacks)
+        attempts.append(guesses)
+        feedbacks.append(fbs)
+        if all(fb == 'G' * 4 for fb in fbs):
+            return n
+    return None
+
+
+def _init_worker():
+    _RowStrategy.word_index = WordIndex.from_file()
+    get_cubes()
+    get_solver_index()
+
+
+def _run_chunk(task):
+    """Play a batch of (cube_id, difficulty) games; returns partial tallies."""
+    strategy_name, seed, games = task
+    rng = random.Random(seed)
+    cubes = get_cubes()
+    strategy = STRATEGIES[strategy_name]()
+    results = []
+    for cube_id, difficulty in games:
+        cube = cubes[cube_id]
+        revealed = set(choose_revealed(cube, REVEAL_COUNTS[difficulty], rng))
+        results.append((cube_id, difficulty, play_game(cube, revealed, strategy, rng)))
+    return results
+
+
+def simulate(n_games, strategy='frequency', difficulties=('easy', 'medium', 'hard', 'insane'),
+             workers=None, seed=0, chunk_size=250):
+    """Play `n_games` spread evenly over difficulties and random cubes."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"unknown strategy {strategy!r}; choose from {sorted(STRATEGIES)}")
+    unknown = [d for d in difficulties if d not in REVEAL_COUNTS]
+    if unknown:
+        raise ValueError(f"unknown difficulties {unknown}; choose from {sorted(REVEAL_COUNTS)}")
+    cubes = get_cubes()
+    if not cubes:
+        raise RuntimeError("No cubes found. Run generators/generate_cubes.py first.")
+    rng = random.Random(seed)
+    games = [(rng.randrange(len(cubes)), difficulties[i % len(difficulties)]) for i in range(n_games)]
+    tasks = [(strategy, rng.getrandbits(64), games[i:i + chunk_size])
+             for i in range(0, n_games, chunk_size)]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker) as pool:
+        chunks = list(pool.map(_run_chunk, tasks))
+    elapsed = time.perf_counter() - start
+    return make_report(strategy, chunks, cubes, elapsed)
+
+
+def make_report(strategy, chunks, cubes, elapsed):
+    """Per-difficulty and per-cube tallies from the results of `_run_chunk`."""
+    by_difficulty = defaultdict(Counter)
+    by_cube = defaultdict(lambda: [0, 0, 0])  # games, solved, attempts when solved
+    for chunk in chunks:
+        for cube_id, difficulty, used in chunk:
+            by_difficulty[difficulty][used if used is not None else 'failed'] += 1
+            stats = by_cube[cube_id]
+            stats[0] += 1
+            if used is not None:
+                stats[1] += 1
+                stats[2] += used
+    n_games = sum(len(chunk) for chunk in chunks)
+
+    report = {
+        'strategy': strategy,
+        'games': n_games,
+        'elapsed_seconds': elapsed,
+        'games_per_second': n_games / elapsed if elapsed else 0.0,
+        'difficulties': {},
+        'cubes': {},
+    }
+    for difficulty, hist in by_difficulty.items():
+        total = sum(hist.values())
+        solved = total - hist['failed']
+        report['difficulties'][difficulty] = {
+            'games': total,
+            'solve_rate': solved / total if total else 0.0,
+            'attempts': {str(k): hist[k] for k in list(range(1, MAX_ATTEMPTS + 1)) + ['failed']},
+        }
+    for cube_id, (played, solved, used) in sorted(by_cube.items()):
+        report['cubes']['/'.join(cubes[cube_id])] = {
+            'games': played,
+            'solve_rate': solved / played,
+            'mean_attempts': used / solved if solved else None,
+        }
+    return report
+
+
+def print_report(report, hardest=10):
+    print(f"{report['games']} games with strategy '{report['strategy']}' in "
+          f"{report['elapsed_seconds']:.1f}s ({report['games_per_second']:.0f} games/s)")
+    for difficulty, d in report['difficulties'].items():
+        hist = ' '.join(f"{k}:{v}" for k, v in d['attempts'].items())
+        print(f"  {difficulty:<7} solved {d['solve_rate']:.1%} of {d['games']}  [{hist}]")
+    cubes = sorted(report['cubes'].items(),
+                   key=lambda kv: (kv[1]['solve_rate'], -(kv[1]['mean_attempts'] or MAX_ATTEMPTS + 1)))
+    print("Hardest cubes:")
+    for key, c in cubes[:hardest]:
+        mean = f"{c['mean_attempts']:.1f}" if c['mean_attempts'] else '-'
+        print(f"  {key}  solved {c['solve_rate']:.0%} of {c['games']}, mean attempts {mean}")
+
+
+def write_report(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
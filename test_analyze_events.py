@@ -0,0 +1,86 @@
+"""
+Test the per-cube, per-word and per-mode statistics in generators/analyze_events.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generators'))
+
+import eventlog  # noqa: E402
+from analyze_events import EventStats, load_cube_names  # noqa: E402
+from cubefile import write_cubes  # noqa: E402
+
+CUBE = ['mime', 'idea', 'loss', 'else']
+OTHER = ['acid', 'node', 'area', 'lead']
+MISS = ['mild', 'idea', 'lose', 'else']
+
+
+def write_log(path, records):
+    with open(path, 'wb') as f:
+        f.write(eventlog.HEADER.pack(eventlog.MAGIC, eventlog.VERSION, eventlog.RECORD.size))
+        for record in records:
+            f.write(record)
+
+
+def sample_records():
+    pack = eventlog.pack
+    return [
+        # a hard game solved on the second attempt
+        pack(eventlog.START, 'hard', CUBE, now=0),
+        pack(eventlog.GUESS, 'hard', CUBE, 1, MISS, ['GY__', 'GGGG', 'GGG_', 'GGGG'], now=1),
+        pack(eventlog.GUESS, 'hard', CUBE, 2, CUBE, ['GGGG'] * 4, solved=True, now=2),
+        # a daily game on the same cube given up after one reveal
+        pack(eventlog.START, 'daily', CUBE, now=3),
+        pack(eventlog.REVEAL, 'daily', CUBE, 1, now=4),
+        # a guess on a cube whose start was in a log that is not being read
+        pack(eventlog.GUESS, 'easy', OTHER, 1, OTHER, ['GGGG'] * 4, solved=True, now=5),
+    ]
+
+
+def test_report_counts_cubes_words_and_modes():
+    """Test: starts, solves, reveals, attempts and word counts add up per cube, word and mode"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'events-1-0.bin')
+        write_log(path, sample_records())
+        cubes_file = os.path.join(tmp, 'cubes.txt')
+        write_cubes([CUBE], cubes_file)
+        stats = EventStats()
+        assert stats.add_file(path) == 6
+        report = stats.report(load_cube_names(cubes_file), top=10, min_starts=1)
+
+    assert report['records'] == 6
+    assert report['events'] == {'start': 2, 'guess': 3, 'reveal': 1}
+    assert report['modes']['hard'] == {'starts': 1, 'solves': 1, 'solve_rate': 1.0}
+    assert report['modes']['daily'] == {'starts': 1, 'solves': 0, 'solve_rate': 0.0}
+    assert report['modes']['easy'] == {'starts': 0, 'solves': 1, 'solve_rate': None}
+    assert report['attempts_when_solved'] == {'1': 1, '2': 1}
+
+    named = next(c for c in report['most_played_cubes'] if c['cube'] == '/'.join(CUBE))
+    assert named == {'cube': '/'.join(CUBE), 'starts': 2, 'guesses': 2, 'solves': 1, 'reveals': 1,
+                     'solve_rate': 0.5, 'mean_attempts': 2.0}
+    assert [c['cube'] for c in report['hardest_cubes']] == ['/'.join(CUBE)]
+    assert report['distinct_cubes'] == 2
+
+    words = {w['word']: (w['guessed'], w['correct']) for w in report['most_guessed_words']}
+    assert words['idea'] == (2, 2)
+    assert words['mild'] == (1, 0)
+    assert words['lose'] == (1, 0)
+    assert words['mime'] == (1, 1)
+
+
+def test_min_starts_zero_skips_cubes_never_started():
+    """Test: --min-starts 0 ranks the hardest cubes without tripping over a missing solve rate"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'events-1-0.bin')
+        write_log(path, sample_records())
+        stats = EventStats()
+        stats.add_file(path)
+    report = stats.report(min_starts=0)
+    assert [c['cube'] for c in report['hardest_cubes']] == [f'{eventlog.cube_id(CUBE):08x}']
+
+
+if __name__ == '__main__':
+    test_report_counts_cubes_words_and_modes()
+    test_min_starts_zero_skips_cubes_never_started()
+    print("Tests complete!")
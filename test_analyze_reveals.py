@@ -0,0 +1,63 @@
+"""
+Test the reveal pattern analysis in generators/analyze_reveals.py
+"""
+import os
+import sys
+from itertools import combinations
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generators'))
+
+from analyze_reveals import analyze, encode_cubes, match_counts  # noqa: E402
+from cubefile import load_cubes  # noqa: E402
+
+CUBES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'word_lists', 'word_cubes.txt')
+
+
+def corpus():
+    # the shipped corpus starts with runs of near duplicates, which makes
+    # selective patterns rare enough to be interesting
+    return load_cubes(CUBES_FILE)[:40]
+
+
+def matches(cubes, cube, cells):
+    letters = ''.join(cube)
+    return sum(all(''.join(other)[cell] == letters[cell] for cell in cells) for other in cubes)
+
+
+def test_match_counts_agree_with_brute_force():
+    """Test: vectorized counts equal a direct comparison of revealed letters"""
+    cubes = corpus()
+    codes = encode_cubes(cubes)
+    for cells in [(0, 1, 2, 3), (0, 5, 10, 15), (12, 13, 14, 15), (3,), tuple(range(16))]:
+        counts = match_counts(codes, cells)
+        assert list(counts) == [matches(cubes, cube, cells) for cube in cubes]
+
+
+def test_kept_masks_match_at_most_max_matches_cubes():
+    """Test: every kept mask reveals `size` cells that match at most `max_matches` cubes"""
+    cubes = corpus()
+    codes = encode_cubes(cubes)
+    patterns = list(combinations(range(16), 4))
+    # counts[p, i]: cubes matching cube i under pattern p
+    all_counts = np.array([match_counts(codes, p) for p in patterns])
+    for max_matches in (1, 2):
+        table = analyze(cubes, sizes=(4,), max_matches=max_matches, keep=8, progress=False)
+        for i, cube in enumerate(cubes):
+            masks = table['/'.join(cube)]['4']
+            # how many patterns qualify for this cube, and the best any pattern does
+            counts = all_counts[:, i]
+            qualifying = int((counts <= max_matches).sum())
+            assert len(masks) == len(set(masks)) == min(8, qualifying or int((counts == counts.min()).sum()))
+            for mask in masks:
+                cells = [c for c in range(16) if mask >> c & 1]
+                assert len(cells) == 4
+                n = matches(cubes, cube, cells)
+                assert n <= max_matches if qualifying else n == counts.min()
+
+
+if __name__ == '__main__':
+    test_match_counts_agree_with_brute_force()
+    test_kept_masks_match_at_most_max_matches_cubes()
+    print("Tests complete!")
@@ -0,0 +1,28 @@
+"""
+Test the LRU of rendered attempt grids used by the index page
+"""
+from unittest import mock
+
+import app
+
+
+def test_attempt_fragments_are_cached_and_evicted():
+    """Test: an attempt renders once, revealed cells are part of the key, and the LRU is bounded"""
+    app.ATTEMPT_FRAGMENTS.clear()
+    rows, fbs = ['mile', 'id  ', '    ', 'else'], ['G_Y_', 'GP__', '____', 'GGGG']
+    with mock.patch.object(app, 'FRAGMENT_CACHE_SIZE', 2), app.app.test_request_context():
+        first = app.attempt_fragment(rows, fbs, {(0, 0)})
+        assert app.attempt_fragment(rows, fbs, {(0, 0)}) is first
+        assert first.count('attempt-tile') == 16
+        assert first.count('revealed') == 1 and first.count('correct') == 5
+        # the same guess with other revealed cells is a different fragment
+        assert app.attempt_fragment(rows, fbs, set()) is not first
+        app.attempt_fragment(['tide'] * 4, ['____'] * 4, set())
+    assert len(app.ATTEMPT_FRAGMENTS) == 2
+    assert ('/'.join(rows), '/'.join(fbs), 1) not in app.ATTEMPT_FRAGMENTS
+    app.ATTEMPT_FRAGMENTS.clear()
+
+
+if __name__ == '__main__':
+    test_attempt_fragments_are_cached_and_evicted()
+    print("Tests complete!")
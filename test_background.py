@@ -0,0 +1,44 @@
+"""
+Test the shared background writer used by results.py and eventlog.py
+"""
+import threading
+
+from background import BackgroundWriter
+
+
+def test_batches_are_written_in_order_and_errors_do_not_stop_the_thread():
+    """Test: queued items reach the sink in order; a failing batch is dropped, later ones still land"""
+    written = []
+
+    def write(sink, batch):
+        if 'bad' in batch:
+            raise OSError('disk full')
+        sink.extend(batch)
+
+    writer = BackgroundWriter('test-writer', lambda: written, write, max_queue=100, max_batch=3)
+    for i in range(10):
+        writer.put(i)
+    writer.flush()
+    writer.put('bad')
+    writer.flush()
+    writer.put(10)
+    writer.flush()
+    assert written == list(range(11))
+
+
+def test_full_queue_drops_instead_of_blocking():
+    """Test: put() never blocks; items past max_queue are counted as dropped"""
+    release = threading.Event()
+    writer = BackgroundWriter('test-writer', lambda: None, lambda sink, batch: release.wait(),
+                              max_queue=2)
+    for i in range(20):
+        writer.put(i)
+    assert 15 <= writer.dropped <= 18
+    release.set()
+    writer.flush()
+
+
+if __name__ == '__main__':
+    test_batches_are_written_in_order_and_errors_do_not_stop_the_thread()
+    test_full_queue_drops_instead_of_blocking()
+    print("Tests complete!")
@@ -0,0 +1,56 @@
+"""
+Test the bitmap solver index against the real feedback rules
+"""
+from app import compute_feedback_all_rows
+from cube_index import CubeIndex, iter_ids
+
+CUBES = [
+    ['mask', 'area', 'made', 'sage'],
+    ['mill', 'idea', 'most', 'else'],
+    ['mist', 'idea', 'most', 'else'],
+    ['game', 'area', 'made', 'edge'],
+]
+
+
+def test_narrow_keeps_solution():
+    """Test: the true cube always survives narrowing by its own feedback"""
+    index = CubeIndex(CUBES)
+    solution = CUBES[1]
+    revealed = {(0, 0), (2, 1)}
+    known = {(r, c): solution[r][c] for (r, c) in revealed}
+
+    guesses = ['mist', 'idea', 'moss', 'else']
+    fbs = compute_feedback_all_rows(guesses, solution, revealed, [], [])
+    mask = index.narrow(known, [guesses], [fbs])
+    ids = list(iter_ids(mask))
+    print(f"Candidates after one guess: {[CUBES[i] for i in ids]}")
+
+    assert 1 in ids, "Solution must remain a candidate"
+    # 'mist' scored non-green at (0, 2), ruling out cube 2; cubes 0 and 3 fail the revealed letters
+    assert ids == [1], f"Expected only cube 1, got {ids}"
+
+
+def test_letter_counts():
+    """Test: per-cell letter counts over a candidate set"""
+    index = CubeIndex(CUBES)
+    counts = index.letter_counts(index.all, 1, 0)
+    assert counts == {'a': 2, 'i': 2}, f"Unexpected counts {counts}"
+
+
+def test_matching_words_and_avoided_letters():
+    """Test: word postings cover rows and columns, and avoided letters exclude cubes"""
+    index = CubeIndex(CUBES)
+    assert list(iter_ids(index.matching(['idea']))) == [1, 2]
+    assert list(iter_ids(index.matching(['made', 'sage']))) == [0]
+    # 'mime' is the first column of cubes 1 and 2
+    assert list(iter_ids(index.matching(['mime']))) == [1, 2]
+    # cube 0 also has 'made' but contains a 'k'
+    assert list(iter_ids(index.matching(['made'], avoid='kx'))) == [3]
+    assert index.matching(['zzzz']) == 0
+
+
+if __name__ == '__main__':
+    test_narrow_keeps_solution()
+    test_letter_counts()
+    test_matching_words_and_avoided_letters()
+    print("Tests complete!")
@@ -0,0 +1,46 @@
+"""
+Test near-duplicate cube removal in generators/dedupe_cubes.py and the shared cube file format
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generators'))
+
+from cubefile import load_cubes, write_cubes  # noqa: E402
+from dedupe_cubes import cluster, dedupe, features, jaccard  # noqa: E402
+
+BASE = ['acid', 'node', 'area', 'lead']
+# one letter changed: 'lead' -> 'leaf' (and so column 'dead' -> 'deaf')
+VARIANT = ['acid', 'node', 'area', 'leaf']
+UNRELATED = ['mime', 'idea', 'loss', 'else']
+
+
+def test_one_letter_variant_collapses_and_unrelated_cube_survives():
+    """Test: a one-letter variant joins its original's cluster; an unrelated cube leads its own"""
+    assert jaccard(features(BASE), features(VARIANT)) > 0.7
+    assert cluster([BASE, VARIANT, UNRELATED]) == [0, 0, 2]
+    assert dedupe([BASE, VARIANT, UNRELATED]) == [BASE, UNRELATED]
+    assert dedupe([BASE, VARIANT, UNRELATED], keep=2) == [BASE, VARIANT, UNRELATED]
+    # above their similarity nothing is a duplicate
+    assert dedupe([BASE, VARIANT, UNRELATED], threshold=0.99) == [BASE, VARIANT, UNRELATED]
+    assert cluster([]) == []
+
+
+def test_cube_file_round_trip_is_atomic():
+    """Test: write_cubes replaces the file in one rename and load_cubes reads it back"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'lists', 'word_cubes.txt')
+        write_cubes([BASE, UNRELATED], path)
+        assert load_cubes(path) == [BASE, UNRELATED]
+        write_cubes([VARIANT], path)
+        assert load_cubes(path) == [VARIANT]
+        assert os.listdir(os.path.dirname(path)) == ['word_cubes.txt']
+        with open(path) as f:
+            assert f.read().startswith('a c i d\nn o d e\n')
+
+
+if __name__ == '__main__':
+    test_one_letter_variant_collapses_and_unrelated_cube_survives()
+    test_cube_file_round_trip_is_atomic()
+    print("Tests complete!")
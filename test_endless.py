@@ -0,0 +1,65 @@
+"""
+Test endless mode: prefetched boards expose no solution letters and guesses replay feedback
+"""
+import app
+
+
+def client():
+    app.app.config['TESTING'] = True
+    return app.app.test_client()
+
+
+def test_prefetched_boards_hide_the_solution():
+    """Test: prefetched boards carry revealed letters only, and tampered tokens are refused"""
+    c = client()
+    data = c.get('/endless/next?n=4&level=easy').get_json()
+    assert len(data['boards']) == 4
+    cubes = app.get_random_cubes()
+    for board in data['boards']:
+        locale, cube, revealed = app.load_endless_board(board['token'])
+        assert cube in cubes
+        assert len(revealed) == app.REVEAL_COUNTS['easy']
+        assert board['revealed'].count('.') == 16 - len(revealed)
+        hidden = [ch for i, ch in enumerate(''.join(cube)) if (i // 4, i % 4) not in revealed]
+        assert ''.join(hidden) not in board['token']
+    assert app.load_endless_board(data['boards'][0]['token'] + 'x') is None
+
+
+def test_endless_guess_replays_attempts_and_returns_solution_when_solved():
+    """Test: feedback matches the session game's rules and the solution arrives only when solved"""
+    c = client()
+    board = c.get('/endless/next?n=1').get_json()['boards'][0]
+    _, cube, revealed = app.load_endless_board(board['token'])
+    blank = ['    '] * 4
+
+    resp = c.post('/endless/guess', json={'token': board['token'], 'attempts': [blank]})
+    first = resp.get_json()
+    assert resp.status_code == 200
+    assert not first['solved'] and 'solution' not in first
+    expected = app.compute_feedback_all_rows(blank, cube, revealed, [], [])
+    assert first['feedback'] == expected
+
+    resp = c.post('/endless/guess', json={'token': board['token'], 'attempts': [blank, list(cube)]})
+    second = resp.get_json()
+    assert second['solved'] and second['attempt'] == 2
+    assert second['solution'] == cube
+
+    resp = c.post('/endless/guess', json={'token': 'forged', 'attempts': [blank]})
+    assert resp.status_code == 410
+
+
+def test_endless_guess_rejects_non_object_bodies():
+    """Test: a JSON body that is not an object is a 400, not a crash"""
+    c = client()
+    for body in ([1, 2], 'token', 3, None):
+        resp = c.post('/endless/guess', json=body)
+        assert resp.status_code == 400, body
+    resp = c.post('/endless/guess', data='not json', content_type='application/json')
+    assert resp.status_code == 400
+
+
+if __name__ == '__main__':
+    test_prefetched_boards_hide_the_solution()
+    test_endless_guess_replays_attempts_and_returns_solution_when_solved()
+    test_endless_guess_rejects_non_object_bodies()
+    print("Tests complete!")
@@ -0,0 +1,45 @@
+"""
+Test the binary event log record format and rotating writer
+"""
+import glob
+import os
+import tempfile
+from unittest import mock
+
+import eventlog
+
+
+def test_rows_and_feedback_round_trip():
+    """Test: packed letters and feedback unpack to the same rows"""
+    rows = ['idea', 'mi s', '    ', 'zzzz']
+    fbs = ['GGGG', 'G_Y_', '____', 'PPPP']
+    assert eventlog.unpack_rows(eventlog.pack_rows(rows)) == rows
+    assert eventlog.unpack_feedback(eventlog.pack_feedback(fbs)) == fbs
+
+
+def test_writer_rotates_and_reader_skips_partial_records():
+    """Test: files rotate at MAX_BYTES and a torn last record is ignored"""
+    cube = ['mime', 'idea', 'loss', 'else']
+    with tempfile.TemporaryDirectory() as tmp, mock.patch.multiple(
+            eventlog, ENABLED=True, LOG_DIR=tmp,
+            MAX_BYTES=eventlog.HEADER.size + 3 * eventlog.RECORD.size):
+        with mock.patch.object(eventlog, '_writer', eventlog.new_writer()):
+            eventlog.log_start('hard', cube)
+            for attempt in range(1, 7):
+                eventlog.log_guess('hard', cube, attempt, cube, ['GGGG'] * 4, attempt == 6)
+                eventlog.flush()
+        files = sorted(glob.glob(os.path.join(tmp, 'events-*.bin')))
+        assert len(files) >= 3
+        with open(files[-1], 'ab') as f:
+            f.write(b'\x01\x02\x03')
+
+        records = [r for path in files for r in eventlog.read_records(path)]
+    assert len(records) == 7
+    assert {r[6] for r in records} == {eventlog.cube_id(cube)}
+    assert records[-1][2] == eventlog.GUESS and records[-1][5] == eventlog.FLAG_SOLVED
+
+
+if __name__ == '__main__':
+    test_rows_and_feedback_round_trip()
+    test_writer_rotates_and_reader_skips_partial_records()
+    print("Tests complete!")
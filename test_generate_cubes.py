@@ -0,0 +1,82 @@
+"""
+Test the cube search in generators/generate_cubes.py
+"""
+import io
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generators'))
+
+from generate_cubes import (SearchStats, find_word_cubes, iter_word_cubes,  # noqa: E402
+                            sample_word_cubes)
+
+# rows of mime/idea/loss/else plus its columns mile/idol/mess/ease
+WORDS = ['mime', 'idea', 'loss', 'else', 'mile', 'idol', 'mess', 'ease']
+
+
+def test_finds_cube_and_transpose():
+    """Test: a cube and its transpose are both found, with distinct rows and columns"""
+    cubes = find_word_cubes(WORDS)
+    print(f"Found: {cubes}")
+    assert ['mime', 'idea', 'loss', 'else'] in cubes
+    assert ['mile', 'idol', 'mess', 'ease'] in cubes
+    for cube in cubes:
+        cols = [''.join(cube[r][c] for r in range(4)) for c in range(4)]
+        assert len(set(cube + cols)) == 8, f"Rows/columns repeat in {cube}"
+
+
+def test_constraints_prune_rows_and_columns():
+    """Test: excluded and blocklisted words are never used as rows or columns"""
+    assert find_word_cubes(WORDS, exclude=['idol']) == []
+    assert find_word_cubes(WORDS, blocklist=['ess']) == []
+    freqs = {w: 5.0 for w in WORDS}
+    freqs['ease'] = 2.0
+    stats = SearchStats()
+    assert find_word_cubes(WORDS, min_zipf=3.0, frequencies=freqs, stats=stats) == []
+    assert stats.excluded_words == 1
+
+
+def test_iterator_is_lazy_and_finishes_stats():
+    """Test: iter_word_cubes yields the same cubes one at a time and closes its stats"""
+    stats = SearchStats()
+    cubes = iter_word_cubes(WORDS, stats=stats)
+    first = next(cubes)
+    assert first == find_word_cubes(WORDS)[0]
+    assert stats.end_time is None
+    cubes.close()
+    assert stats.end_time is not None
+
+
+def test_sampling_returns_distinct_valid_cubes():
+    """Test: random sampling finds every cube of a tiny space, without repeats"""
+    sample = sample_word_cubes(WORDS, 10, seed=1)
+    assert sorted(sample) == sorted(find_word_cubes(WORDS))
+    assert sample_word_cubes(WORDS, 10, seed=1, exclude=['idol']) == []
+
+
+def test_sampling_reports_progress_against_the_target():
+    """Test: sampling prints periodic progress with cubes found out of k and a budget-bound ETA"""
+    out = io.StringIO()
+    stats = SearchStats(progress_interval=1e-9, out=out, progress_format='json')
+    sample = sample_word_cubes(WORDS, 10, seed=1, time_budget=60, stats=stats)
+    events = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert len(events) > 2
+    assert all(e['target'] == 10 and e['eta'] <= 60 for e in events)
+    assert [e['restarts'] for e in events] == sorted(e['restarts'] for e in events)
+    assert events[-1]['cubes'] == len(sample) == stats.cubes
+
+    out = io.StringIO()
+    stats = SearchStats(progress_interval=1e-9, out=out)
+    sample_word_cubes(WORDS, 1, seed=1, stats=stats)
+    assert out.getvalue().splitlines()[-1].split('] ')[1].startswith('1/1 cubes')
+    assert out.getvalue().rstrip().endswith('ETA 0s')
+
+
+if __name__ == '__main__':
+    test_finds_cube_and_transpose()
+    test_constraints_prune_rows_and_columns()
+    test_iterator_is_lazy_and_finishes_stats()
+    test_sampling_returns_distinct_valid_cubes()
+    test_sampling_reports_progress_against_the_target()
+    print("Tests complete!")
@@ -0,0 +1,143 @@
+"""
+Test the admin regeneration job's arguments and event stream
+"""
+import json
+import os
+import tempfile
+import time
+from unittest import mock
+
+import app
+import jobs
+import locales
+
+# Stands in for generators/generate_cubes.py: reports its niceness, then
+# writes one cube to --out, writes nothing loadable, or fails, depending on
+# its last argument.
+STUB_GENERATOR = """\
+import os, sys
+args = sys.argv[1:]
+out = args[args.index('--out') + 1]
+print('{"event": "progress", "niceness": %d}' % os.nice(0))
+if args[-1] == 'fail':
+    sys.exit(3)
+with open(out, 'w') as f:
+    f.write('m i m e\\ni d e a\\nl o s s\\ne l s e\\n\\n' if args[-1] == 'ok' else 'not a cube\\n')
+"""
+OLD_CORPUS = 'a c i d\nn o d e\na r e a\nl e a d\n\n'
+
+
+def test_generator_args():
+    """Test: request values become generator flags; bad values are rejected"""
+    assert jobs.generator_args({'top_n': '800', 'dedupe': '0.5', 'blocklist': 'daily'}) == [
+        '--top-n', '800', '--dedupe', '0.5', '--blocklist', 'daily']
+    assert jobs.generator_args({}) == []
+    for values in ({'blocklist': 'nope'}, {'top_n': 'lots'}):
+        try:
+            jobs.generator_args(values)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {values}")
+
+
+def test_stream_resumes_after_last_event_id():
+    """Test: a reconnecting client only gets events after Last-Event-ID"""
+    job_id = '20260101-000000-abcdef'
+    with tempfile.TemporaryDirectory() as tmp, mock.patch.object(jobs, 'JOB_DIR', tmp):
+        with open(os.path.join(tmp, f'{job_id}.jsonl'), 'w') as f:
+            for event in ('started', 'progress', 'progress', 'done'):
+                f.write(json.dumps({'event': event}) + '\n')
+
+        frames = list(jobs.stream_events(job_id, last_id=2))
+    assert frames[0].startswith('retry:')
+    assert [frame.split('\n')[:2] for frame in frames[1:]] == [
+        ['id: 3', 'event: progress'], ['id: 4', 'event: done']]
+
+
+def run_job(tmp, outcome):
+    """Run RegenerateJob with the stub generator over a cube file in `tmp`; returns its events."""
+    cubes_file = os.path.join(tmp, 'word_cubes.txt')
+    with open(cubes_file, 'w') as f:
+        f.write(OLD_CORPUS)
+    stub = os.path.join(tmp, 'generator.py')
+    with open(stub, 'w') as f:
+        f.write(STUB_GENERATOR)
+    with mock.patch.multiple(jobs, JOB_DIR=tmp, GENERATOR=stub):
+        job = jobs.RegenerateJob('20260101-000000-abcdef', [outcome], cubes_file,
+                                 app.load_cubes, jobs._try_lock())
+        job.start()
+        job.join(30)
+        with open(jobs._log_path(job.job_id)) as f:
+            return [json.loads(line) for line in f]
+
+
+def test_job_publishes_a_loadable_result_at_lower_priority():
+    """Test: a clean run replaces the cube file, and the generator starts already niced"""
+    with tempfile.TemporaryDirectory() as tmp:
+        events = run_job(tmp, 'ok')
+        cubes = app.load_cubes(os.path.join(tmp, 'word_cubes.txt'))
+        leftovers = os.path.exists(os.path.join(tmp, 'word_cubes.txt.new'))
+        unlocked = not jobs.is_running()
+    assert [e['event'] for e in events] == ['started', 'progress', 'done']
+    assert events[1]['niceness'] == min(os.nice(0) + jobs.NICE, 19)
+    assert events[-1]['cubes'] == 1
+    assert cubes == [['mime', 'idea', 'loss', 'else']]
+    assert not leftovers and unlocked
+
+
+def test_failed_jobs_keep_the_old_corpus():
+    """Test: a failing generator or an output with no cubes leaves the live cube file alone"""
+    for outcome, error in (('fail', 'exited with status 3'), ('empty', 'no cubes generated')):
+        with tempfile.TemporaryDirectory() as tmp:
+            events = run_job(tmp, outcome)
+            with open(os.path.join(tmp, 'word_cubes.txt')) as f:
+                live = f.read()
+            leftovers = os.path.exists(os.path.join(tmp, 'word_cubes.txt.new'))
+        assert events[-1]['event'] == 'failed' and error in events[-1]['error'], events
+        assert live == OLD_CORPUS
+        assert outcome == 'fail' or not leftovers
+
+
+def test_workers_drop_a_corpus_whose_file_changed():
+    """Test: reload_cubes_if_changed evicts the corpus after its file's mtime or size changes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cubes_file = os.path.join(tmp, 'word_cubes.txt')
+        with open(cubes_file, 'w') as f:
+            f.write(OLD_CORPUS)
+        with mock.patch.object(app, 'CUBES_FILE', cubes_file):
+            app.reset_caches()
+            try:
+                locale = locales.DEFAULT_LOCALE
+
+                def check():
+                    app.CUBES_CHECKED_AT = float('-inf')
+                    app.reload_cubes_if_changed()
+                    return locale in app.CORPORA
+
+                assert app.get_cubes(locale) == [['acid', 'node', 'area', 'lead']]
+                assert check()
+
+                # same size, new mtime
+                later = time.time() + 10
+                os.utime(cubes_file, (later, later))
+                assert not check()
+                app.get_cubes(locale)
+                assert check()
+
+                # new size
+                with open(cubes_file, 'a') as f:
+                    f.write('m i m e\ni d e a\nl o s s\ne l s e\n\n')
+                os.utime(cubes_file, (later, later))
+                assert not check()
+                assert len(app.get_cubes(locale)) == 2
+            finally:
+                app.reset_caches()
+
+
+if __name__ == '__main__':
+    test_generator_args()
+    test_stream_resumes_after_last_event_id()
+    test_job_publishes_a_loadable_result_at_lower_priority()
+    test_failed_jobs_keep_the_old_corpus()
+    test_workers_drop_a_corpus_whose_file_changed()
+    print("Tests complete!")
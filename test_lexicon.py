@@ -0,0 +1,71 @@
+"""
+Test the packed lexicon used for guess validation and cube search
+"""
+import os
+import tempfile
+
+import app
+from lexicon import Lexicon
+
+WORDS = ['game', 'gate', 'area', 'made', 'edge', 'Gate', "i'll", 'go', 'mask']
+
+
+def test_membership_and_prefixes():
+    """Test: only clean 4-letter words are kept, sorted and deduplicated"""
+    lex = Lexicon.from_words(WORDS)
+    assert list(lex) == ['area', 'edge', 'game', 'gate', 'made', 'mask']
+    assert 'gate' in lex
+    assert 'gaze' not in lex
+    assert 'go' not in lex
+    assert lex.count_prefix('ga') == 2
+    assert lex.count_prefix('m') == 2
+    assert not lex.has_prefix('x')
+    assert list(lex.words_with_prefix('ma')) == ['made', 'mask']
+
+
+def test_children_follow_prefix_ranges():
+    """Test: trie-style children agree with prefix_range"""
+    lex = Lexicon.from_words(WORDS)
+    lo, hi = lex.prefix_range('ga')
+    children = lex.children(lo, hi, 2)
+    assert children == {'m': lex.prefix_range('gam'), 't': lex.prefix_range('gat')}
+
+
+def test_save_and_mmap_load():
+    """Test: a saved lexicon answers the same queries when memory-mapped"""
+    lex = Lexicon.from_words(WORDS)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'lexicon.bin')
+        lex.save(path)
+        loaded = Lexicon.load(path)
+        assert list(loaded) == list(lex)
+        assert 'made' in loaded
+        assert loaded.prefix_range('ed') == lex.prefix_range('ed')
+
+
+def test_non_words_are_reported_not_counted():
+    """Test: a non-word guess shows "not in word list" and uses no attempt; a wrong word does not"""
+    client = app.app.test_client()
+    client.post('/new', data={'level': 'insane'})
+    with client.session_transaction() as session:
+        cube = session['cube']
+    client.post('/guess', data={'row0': 'qzxv', 'row1': cube[1], 'row2': '    ', 'row3': '    '})
+    page = client.get('/').get_data(as_text=True)
+    assert 'QZXV: not in word list' in page
+    with client.session_transaction() as session:
+        assert session['attempts'] == []
+    # the message shows once, and a real (wrong) word is scored without it
+    wrong = next(w for w in ('mile', 'idea', 'area', 'else') if w != cube[0])
+    client.post('/guess', data={'row0': wrong, 'row1': '    ', 'row2': '    ', 'row3': '    '})
+    page = client.get('/').get_data(as_text=True)
+    assert 'not in word list' not in page
+    with client.session_transaction() as session:
+        assert len(session['attempts']) == 1
+
+
+if __name__ == '__main__':
+    test_membership_and_prefixes()
+    test_children_follow_prefix_ranges()
+    test_save_and_mmap_load()
+    test_non_words_are_reported_not_counted()
+    print("Tests complete!")
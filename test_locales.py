@@ -0,0 +1,45 @@
+"""
+Test per-locale file locations and the app's per-locale corpus LRU
+"""
+import os
+import tempfile
+from unittest import mock
+
+import app
+import locales
+
+
+def test_locale_dirs_and_availability():
+    """Test: locale directories resolve under the base and only locales with cubes are listed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.mkdir(os.path.join(tmp, 'de'))
+        open(os.path.join(tmp, 'de', 'word_cubes.txt'), 'w').close()
+        os.mkdir(os.path.join(tmp, 'fr'))
+        assert locales.locale_dir(locales.DEFAULT_LOCALE, tmp) == tmp
+        assert locales.locale_dir('de', tmp) == os.path.join(tmp, 'de')
+        try:
+            locales.locale_dir('../etc', tmp)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("accepted a path as a locale code")
+        assert locales.available_locales(tmp) == [locales.DEFAULT_LOCALE, 'de']
+
+
+def test_corpus_lru_evicts_least_recently_used():
+    """Test: loading a locale past LOCALE_CACHE_SIZE drops the least recently used corpus"""
+    with mock.patch.object(app, 'LOCALE_CACHE_SIZE', 2):
+        app.reset_caches()
+        first = app.get_corpus('aa')
+        app.get_corpus('bb')
+        assert app.get_corpus('aa') is first
+        app.get_corpus('cc')
+        assert list(app.CORPORA) == ['aa', 'cc']
+        assert app.get_cubes('cc') == []
+    app.reset_caches()
+
+
+if __name__ == '__main__':
+    test_locale_dirs_and_availability()
+    test_corpus_lru_evicts_least_recently_used()
+    print("Tests complete!")
@@ -0,0 +1,110 @@
+"""
+Test the Prometheus text rendering and request hooks in metrics.py
+"""
+from unittest import mock
+
+from flask import Flask, session
+
+import app
+import metrics
+
+
+def test_render_counters_and_histograms():
+    """Test: counters and cumulative histogram buckets in the exposition format"""
+    with mock.patch.object(metrics, 'ENABLED', True):
+        metrics.reset()
+        metrics.inc('wordcube_games_started_total', mode='easy')
+        metrics.inc('wordcube_games_started_total', 2, mode='easy')
+        metrics.observe('wordcube_request_seconds', 0.003, route='index')
+        metrics.observe('wordcube_request_seconds', 7.0, route='index')
+        lines = metrics.render().splitlines()
+        metrics.reset()
+    assert '# TYPE wordcube_games_started_total counter' in lines
+    assert 'wordcube_games_started_total{mode="easy"} 3' in lines
+    assert 'wordcube_request_seconds_bucket{route="index",le="0.0025"} 0' in lines
+    assert 'wordcube_request_seconds_bucket{route="index",le="0.005"} 1' in lines
+    assert 'wordcube_request_seconds_bucket{route="index",le="2.5"} 1' in lines
+    assert 'wordcube_request_seconds_bucket{route="index",le="+Inf"} 2' in lines
+    assert 'wordcube_request_seconds_count{route="index"} 2' in lines
+
+
+def test_label_values_are_escaped():
+    """Test: quotes, backslashes and newlines in label values cannot forge lines"""
+    with mock.patch.object(metrics, 'ENABLED', True):
+        metrics.reset()
+        metrics.inc('wordcube_games_started_total', mode='x"} 1\nevil_metric{a="b\\')
+        lines = metrics.render().splitlines()
+        metrics.reset()
+    assert not any(line.startswith('evil_metric') for line in lines)
+    assert 'wordcube_games_started_total{mode="x\\"} 1\\nevil_metric{a=\\"b\\\\"} 1' in lines
+
+
+def test_hooks_record_requests_timing_and_cookie_size():
+    """Test: request counters, Server-Timing and session cookie size from init_app"""
+    test_app = Flask(__name__)
+    test_app.secret_key = 'test'
+
+    @test_app.route('/hello')
+    def hello():
+        session['n'] = 1
+        with metrics.timed('work'):
+            return 'hi'
+
+    with mock.patch.object(metrics, 'ENABLED', True), mock.patch.object(metrics, 'SERVER_TIMING', True):
+        metrics.reset()
+        metrics.init_app(test_app)
+        client = test_app.test_client()
+        response = client.get('/hello')
+        text = client.get('/metrics').get_data(as_text=True)
+        metrics.reset()
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('work;dur=') and 'total;dur=' in timing and 'session_save;dur=' in timing
+    assert 'wordcube_requests_total{route="hello",status="200"} 1' in text
+    assert 'wordcube_session_cookie_bytes_count 1' in text
+    assert 'wordcube_section_seconds_count{section="work"} 1' in text
+
+
+def test_session_timing_stays_on_its_own_app():
+    """Test: init_app gives the app its own session interface and leaves other apps' alone"""
+    other = Flask('other')
+    test_app = Flask(__name__)
+    test_app.secret_key = 'test'
+
+    @test_app.route('/hello')
+    def hello():
+        session['n'] = 1
+        return 'hi'
+
+    with mock.patch.object(metrics, 'ENABLED', True):
+        metrics.reset()
+        metrics.init_app(test_app)
+        test_app.test_client().get('/hello')
+        text = metrics.render()
+        metrics.reset()
+    assert isinstance(test_app.session_interface, metrics.TimedSessionInterface)
+    assert not isinstance(other.session_interface, metrics.TimedSessionInterface)
+    assert 'save_session' not in vars(other.session_interface)
+    assert 'wordcube_session_cookie_bytes_count 1' in text
+
+
+def test_unknown_modes_are_folded_into_other():
+    """Test: a made-up level on /new is counted as mode "other" """
+    with mock.patch.object(metrics, 'ENABLED', True):
+        metrics.reset()
+        client = app.app.test_client()
+        client.post('/new', data={'level': 'x"} 1\nevil_metric{a="b'})
+        client.post('/new', data={'level': 'easy'})
+        text = metrics.render()
+        metrics.reset()
+    assert 'wordcube_games_started_total{mode="other"} 1' in text
+    assert 'wordcube_games_started_total{mode="easy"} 1' in text
+    assert 'evil' not in text
+
+
+if __name__ == '__main__':
+    test_render_counters_and_histograms()
+    test_label_values_are_escaped()
+    test_hooks_record_requests_timing_and_cookie_size()
+    test_session_timing_stays_on_its_own_app()
+    test_unknown_modes_are_folded_into_other()
+    print("Tests complete!")
@@ -0,0 +1,42 @@
+"""
+Test the sampling profiler's per-request dumps and folded stacks
+"""
+import glob
+import os
+import tempfile
+import time
+from unittest import mock
+
+from flask import Flask
+
+import profiling
+
+
+def test_every_sampled_request_gets_its_own_dump():
+    """Test: at rate 1, requests in the same second write separate dumps and one folded file"""
+    test_app = Flask(__name__)
+
+    @test_app.route('/slow')
+    def slow():
+        time.sleep(0.02)
+        return 'ok'
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            mock.patch.multiple(profiling, RATE=1.0, PROFILE_DIR=tmp, INTERVAL=0.001):
+        profiling.init_app(test_app)
+        client = test_app.test_client()
+        for _ in range(3):
+            assert client.get('/slow').status_code == 200
+        assert len(glob.glob(os.path.join(tmp, 'slow', '*.prof'))) == 3
+        assert len(glob.glob(os.path.join(tmp, 'slow', '*.alloc.txt'))) == 3
+        folded = glob.glob(os.path.join(tmp, 'slow.*.folded'))
+        assert len(folded) == 1
+        with open(folded[0]) as f:
+            lines = f.read().splitlines()
+    assert lines and any('test_profiling:slow' in line for line in lines)
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+
+
+if __name__ == '__main__':
+    test_every_sampled_request_gets_its_own_dump()
+    print("Tests complete!")
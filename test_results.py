@@ -0,0 +1,128 @@
+"""
+Test the SQLite results store and its cached daily stats
+"""
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+
+import app
+import results
+
+
+def use_db(directory, refresh):
+    """Patch results to a fresh database in `directory` with a new writer and no snapshots."""
+    results._snapshots.clear()
+    return mock.patch.multiple(results, DB_PATH=os.path.join(directory, 'results.db'),
+                               REFRESH_SECONDS=refresh, _writer=results.new_writer())
+
+
+def test_recorded_games_show_up_in_daily_stats():
+    """Test: queued results are written and aggregated into histograms"""
+    with tempfile.TemporaryDirectory() as tmp, use_db(tmp, 0):
+        results.record('2026-01-01', 'daily', 'daily', True, 3, 45.0)
+        results.record('2026-01-01', 'daily', 'daily', True, 3, 20.0)
+        results.record('2026-01-01', 'daily', 'daily', True, 9, 4000.0)
+        results.record('2026-01-01', 'daily', 'daily', False, 6, 100.0)
+        results.record('2026-01-01', 'custom', 'easy', True, 1, None)
+        results.record('2026-01-02', 'daily', 'daily', True, 2, 10.0)
+        results.flush()
+
+        stats = results.daily_stats('2026-01-01', 'daily')
+        assert stats['games'] == 4
+        assert stats['solved'] == 3
+        assert stats['solve_rate'] == 0.75
+        assert stats['attempts']['3'] == 2
+        assert stats['attempts']['7+'] == 1
+        assert stats['times'] == {'<=30s': 1, '<=60s': 1, '<=120s': 0, '<=300s': 0,
+                                  '<=600s': 0, '<=1800s': 0, '>1800s': 1}
+
+        everything = results.daily_stats('2026-01-01')
+        assert everything['games'] == 5
+        assert everything['attempts']['1'] == 1
+
+
+def test_daily_stats_are_served_from_the_snapshot():
+    """Test: within the refresh interval new rows are not queried"""
+    with tempfile.TemporaryDirectory() as tmp, use_db(tmp, 3600):
+        first = results.daily_stats('2026-01-01')
+        conn = results.connect()
+        with conn:
+            results._insert(conn, [('2026-01-01', 'daily', 'daily', 1, 2, 10.0, 0.0, 0)])
+        conn.close()
+        assert results.daily_stats('2026-01-01') is first
+
+
+def test_snapshots_evict_least_recently_used():
+    """Test: past the limit the oldest unused snapshot goes, not the one in use"""
+    with tempfile.TemporaryDirectory() as tmp, use_db(tmp, 3600), \
+            mock.patch.object(results, 'SNAPSHOT_LIMIT', 2):
+        today = results.daily_stats('2026-01-02')
+        results.daily_stats('2026-01-01')
+        assert results.daily_stats('2026-01-02') is today
+        results.daily_stats('2026-01-01', 'daily')
+        assert list(results._snapshots) == [('2026-01-02', None), ('2026-01-01', 'daily')]
+
+
+def test_stats_endpoint_rejects_unknown_days_and_modes():
+    """Test: /stats only serves recent days and known modes"""
+    client = app.app.test_client()
+    today = app.get_daily_seed()[0]
+    with tempfile.TemporaryDirectory() as tmp, use_db(tmp, 3600):
+        assert client.get('/stats').get_json()['day'] == today
+        assert client.get(f'/stats?day={today}&mode=daily').status_code == 200
+        assert client.get('/stats?day=2001-01-01').status_code == 400
+        assert client.get('/stats?day=today').status_code == 400
+        assert client.get('/stats?mode=whatever').status_code == 400
+        assert len(results._snapshots) == 2
+
+
+def test_hinted_games_are_left_out_of_stats():
+    """Test: a game where /hint handed over a letter is stored as hinted and not counted"""
+    client = app.app.test_client()
+    today = app.get_daily_seed()[0]
+    with tempfile.TemporaryDirectory() as tmp, use_db(tmp, 0):
+        results.record(today, 'daily', 'daily', True, 2, 30.0)
+        results.record(today, 'daily', 'daily', True, 1, 5.0, hinted=True)
+
+        client.get('/daily')
+        suggestion = client.get('/hint?letter=1').get_json().get('suggestion')
+        assert suggestion is not None
+        with client.session_transaction() as sess:
+            assert sess['hinted']
+            cube = sess['cube']
+        client.post('/guess', data={f'row{i}': row for i, row in enumerate(cube)})
+        results.flush()
+
+        conn = results.connect()
+        hinted = [row[0] for row in conn.execute('SELECT hinted FROM results ORDER BY finished_at')]
+        conn.close()
+        stats = results.daily_stats(today, 'daily')
+    assert hinted == [0, 1, 1]
+    assert stats['games'] == 1 and stats['attempts']['2'] == 1
+
+
+def test_old_databases_gain_the_hinted_column():
+    """Test: a results table from before hint tracking is migrated on connect"""
+    with tempfile.TemporaryDirectory() as tmp, use_db(tmp, 0):
+        conn = sqlite3.connect(results.DB_PATH)
+        conn.execute('CREATE TABLE results (day TEXT NOT NULL, mode TEXT NOT NULL, difficulty TEXT, '
+                     'solved INTEGER NOT NULL, attempts INTEGER NOT NULL, seconds REAL, '
+                     'finished_at REAL NOT NULL)')
+        conn.execute("INSERT INTO results VALUES ('2026-01-01', 'daily', 'daily', 1, 3, 40.0, 0.0)")
+        conn.commit()
+        conn.close()
+        results.record('2026-01-01', 'daily', 'daily', True, 1, 5.0, hinted=True)
+        results.flush()
+        stats = results.daily_stats('2026-01-01')
+    assert stats['games'] == 1 and stats['attempts']['3'] == 1
+
+
+if __name__ == '__main__':
+    test_recorded_games_show_up_in_daily_stats()
+    test_daily_stats_are_served_from_the_snapshot()
+    test_snapshots_evict_least_recently_used()
+    test_stats_endpoint_rejects_unknown_days_and_modes()
+    test_hinted_games_are_left_out_of_stats()
+    test_old_databases_gain_the_hinted_column()
+    print("Tests complete!")
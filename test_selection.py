@@ -0,0 +1,52 @@
+"""
+Test the per-player Feistel permutation used to pick random cubes
+"""
+import random
+
+from selection import Permutation, draw
+
+
+def test_permutation_is_a_bijection():
+    """Test: every index in range comes out exactly once, for awkward sizes too"""
+    for n in (1, 2, 3, 17, 256, 1000, 4099):
+        perm = Permutation(n, seed=12345)
+        assert sorted(perm[i] for i in range(n)) == list(range(n))
+
+
+def test_permutation_depends_on_seed():
+    """Test: different seeds give different orders"""
+    a = [Permutation(500, seed=1)[i] for i in range(500)]
+    b = [Permutation(500, seed=2)[i] for i in range(500)]
+    assert a != b
+
+
+def test_draw_never_repeats_within_a_cycle():
+    """Test: n draws cover the corpus once, then a new cycle starts"""
+    rng = random.Random(0)
+    state = None
+    seen = []
+    for _ in range(300):
+        index, state = draw(state, 300, rng)
+        seen.append(index)
+    assert sorted(seen) == list(range(300))
+    # cycle finished: a fresh cycle starts with a new seed
+    assert state[1] == 0
+
+
+def test_draw_restarts_when_corpus_size_changes():
+    """Test: a new corpus size starts a new permutation"""
+    rng = random.Random(0)
+    index, state = draw(None, 100, rng)
+    index, state = draw(state, 100, rng)
+    assert state[1:] == [2, 100]
+    index, state = draw(state, 150, rng)
+    assert 0 <= index < 150
+    assert state[1:] == [1, 150]
+
+
+if __name__ == '__main__':
+    test_permutation_is_a_bijection()
+    test_permutation_depends_on_seed()
+    test_draw_never_repeats_within_a_cycle()
+    test_draw_restarts_when_corpus_size_changes()
+    print("Tests complete!")
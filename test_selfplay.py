@@ -0,0 +1,55 @@
+"""
+Test headless self-play in selfplay.py, in-process without the worker pool
+"""
+import random
+
+import app
+import selfplay
+
+
+def test_word_index_is_in_frequency_rank_order():
+    """Test: the solver's word index comes from the binary list, most frequent word first"""
+    words = selfplay.WordIndex.from_file().words
+    ranked = [w for w in selfplay.WordList.load(selfplay.WORD_LIST_BIN).words(length=4) if w.isalpha()]
+    assert words == ranked
+    assert words[0] == 'that'
+
+
+def test_row_strategies_find_the_solution():
+    """Test: given enough attempts, each row strategy (and the base class default) solves a cube"""
+    selfplay._init_worker()
+    cube = app.get_cubes()[0]
+    for strategy in (selfplay._RowStrategy(), selfplay.FrequencyStrategy(), selfplay.RandomStrategy()):
+        used = selfplay.play_game(cube, set(), strategy, random.Random(1), max_attempts=500)
+        assert used is not None, type(strategy).__name__
+
+
+def test_report_shape():
+    """Test: chunk results tally into per-difficulty histograms and per-cube rates"""
+    selfplay._init_worker()
+    cubes = app.get_cubes()
+    games = [(i % 5, difficulty) for i, difficulty in enumerate(['easy', 'hard'] * 10)]
+    chunks = [selfplay._run_chunk(('corpus', 7, games[:10])),
+              selfplay._run_chunk(('frequency', 8, games[10:]))]
+    report = selfplay.make_report('mixed', chunks, cubes, 2.0)
+
+    assert report['strategy'] == 'mixed'
+    assert report['games'] == 20
+    assert report['games_per_second'] == 10.0
+    assert set(report['difficulties']) == {'easy', 'hard'}
+    for d in report['difficulties'].values():
+        assert d['games'] == 10
+        assert list(d['attempts']) == [str(n) for n in range(1, app.MAX_ATTEMPTS + 1)] + ['failed']
+        assert sum(d['attempts'].values()) == 10
+        assert 0.0 <= d['solve_rate'] <= 1.0
+    assert set(report['cubes']) == {'/'.join(cubes[i]) for i in range(5)}
+    assert sum(c['games'] for c in report['cubes'].values()) == 20
+    # the corpus strategy's easy games always come down to a single consistent cube
+    assert report['difficulties']['easy']['solve_rate'] > 0
+
+
+if __name__ == '__main__':
+    test_word_index_is_in_frequency_rank_order()
+    test_row_strategies_find_the_solution()
+    test_report_shape()
+    print("Tests complete!")
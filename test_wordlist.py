@@ -0,0 +1,44 @@
+"""
+Test the binary word list with stored frequencies
+"""
+import os
+import tempfile
+
+from lexicon import Lexicon
+from wordlist import WordList, WordListWriter
+
+WORD_LISTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'word_lists')
+
+
+def test_roundtrip_and_filters():
+    """Test: records stream out and come back in rank order with their scores"""
+    entries = [('that', 7.01, 10), ('about', 6.5, 40), ('game', 5.25, 900), ('zany', 2.5, 40000)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'words.bin')
+        with WordListWriter(path, 5) as out:
+            for word, zipf, rank in entries:
+                out.add(word, zipf, rank)
+        wl = WordList.load(path)
+
+        assert len(wl) == 4
+        word, zipf, rank = wl[2]
+        assert (word, rank) == ('game', 900)
+        assert abs(zipf - 5.25) < 1e-6
+        assert list(wl.words(length=4)) == ['that', 'game', 'zany']
+        assert list(wl.words(length=4, top_n=2)) == ['that', 'game']
+        assert list(wl.words(min_zipf=5.0)) == ['that', 'about', 'game']
+        assert set(wl.frequencies(length=5)) == {'about'}
+
+
+def test_shipped_list_matches_the_lexicon():
+    """Test: the shipped binary list holds letters-only words, the same 4-letter set as the lexicon"""
+    wl = WordList.load(os.path.join(WORD_LISTS, 'word_list_wordfreq.bin'))
+    lexicon = Lexicon.load(os.path.join(WORD_LISTS, 'lexicon.bin'))
+    assert all(word.isalpha() for word, _zipf, _rank in wl)
+    assert sorted(wl.frequencies(length=4)) == list(lexicon)
+
+
+if __name__ == '__main__':
+    test_roundtrip_and_filters()
+    test_shipped_list_matches_the_lexicon()
+    print("Tests complete!")
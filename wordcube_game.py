@@ -10,6 +10,7 @@
 Usage:
   python3 wordcube_game.py        # runs interactive game
   python3 wordcube_game.py --reveal  # prints chosen cube and revealed letters (for testing)
+  python3 wordcube_game.py --simulate 10000  # headless self-play report (see selfplay.py)
 
 """
 import argparse
@@ -122,8 +123,26 @@ def play_interactive(cube):
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--reveal', action='store_true', help='print chosen cube and revealed letters and exit')
+    parser.add_argument('--simulate', type=int, metavar='GAMES',
+                        help='play GAMES headless games with a scripted strategy and print a report')
+    parser.add_argument('--strategy', default='frequency', help='self-play strategy (frequency, random, corpus)')
+    parser.add_argument('--difficulty', action='append',
+                        help='difficulty to simulate; repeat for several (default: easy, medium, hard, insane)')
+    parser.add_argument('--workers', type=int, help='self-play worker processes (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=0, help='self-play random seed')
+    parser.add_argument('--json', metavar='PATH', help='also write the self-play report as JSON')
     args = parser.parse_args()
 
+    if args.simulate:
+        import selfplay
+        kwargs = {'difficulties': tuple(args.difficulty)} if args.difficulty else {}
+        report = selfplay.simulate(args.simulate, strategy=args.strategy, workers=args.workers,
+                                   seed=args.seed, **kwargs)
+        selfplay.print_report(report)
+        if args.json:
+            selfplay.write_report(report, args.json)
+        return
+
     cubes = load_cubes()
     if not cubes:
         print('No `word_cubes.txt` found or it contained no cubes. Run main2.py to generate cubes first.')
@@ -0,0 +1,117 @@
+"""Binary word list with stored frequency scores.
+
+`generators/generate_word_list.py` streams one fixed-size record per word into
+`word_lists/word_list_wordfreq.bin`, in frequency-rank order::
+
+    header:  b'WCWL'  u16 version  u16 width  u32 count
+    record:  width bytes word (ASCII, NUL padded)  f32 zipf  u32 rank
+
+`WordList.load` memory-maps the file and decodes records only when asked, so
+consumers can filter by length, rank or Zipf frequency without parsing the
+whole list into Python objects first.
+"""
+import mmap
+import os
+import struct
+
+MAGIC = b'WCWL'
+VERSION = 1
+HEADER = struct.Struct('<4sHHI')
+
+
+def _record(width):
+    return struct.Struct(f'<{width}sfI')
+
+
+class WordListWriter:
+    """Stream (word, zipf, rank) records to `path`; the header is patched on close.
+
+    Written to a temporary file and renamed into place, so readers never see
+    a partial list.
+    """
+
+    def __init__(self, path, width):
+        self.path = path
+        self.width = width
+        self.count = 0
+        self._record = _record(width)
+        self._tmp = path + '.tmp'
+        self._f = None
+
+    def __enter__(self):
+        self._f = open(self._tmp, 'wb')
+        self._f.write(HEADER.pack(MAGIC, VERSION, self.width, 0))
+        return self
+
+    def add(self, word, zipf, rank):
+        data = word.encode('ascii')
+        if len(data) > self.width:
+            raise ValueError(f"{word!r} is longer than the record width {self.width}")
+        self._f.write(self._record.pack(data, zipf, rank))
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._f.close()
+            os.remove(self._tmp)
+            return False
+        self._f.seek(0)
+        self._f.write(HEADER.pack(MAGIC, VERSION, self.width, self.count))
+        self._f.close()
+        os.replace(self._tmp, self.path)
+        return False
+
+
+class WordList:
+    def __init__(self, buf, width, count):
+        self._buf = buf
+        self.width = width
+        self._count = count
+        self._record = _record(width)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, width, count = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} word list")
+        if len(buf) != HEADER.size + _record(width).size * count:
+            raise ValueError(f"{path} is truncated")
+        return cls(buf, width, count)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        """(word, zipf, rank) of the i-th record."""
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        raw, zipf, rank = self._record.unpack_from(self._buf, HEADER.size + i * self._record.size)
+        return raw.rstrip(b'\0').decode('ascii'), zipf, rank
+
+    def __iter__(self):
+        for raw, zipf, rank in self._record.iter_unpack(memoryview(self._buf)[HEADER.size:]):
+            yield raw.rstrip(b'\0').decode('ascii'), zipf, rank
+
+    def words(self, length=None, top_n=None, min_zipf=None):
+        """Yield words in rank order, optionally filtered.
+
+        `top_n` counts words that pass the length filter, matching how
+        `load_word_list(..., top_n=)` truncates the text list.
+        """
+        n = 0
+        for word, zipf, _rank in self:
+            if top_n is not None and n >= top_n:
+                return
+            if length is not None and len(word) != length:
+                continue
+            if min_zipf is not None and zipf < min_zipf:
+                continue
+            n += 1
+            yield word
+
+    def frequencies(self, length=None):
+        """Dict of word -> Zipf frequency."""
+        return {word: zipf for word, zipf, _rank in self
+                if length is None or len(word) == length}